@@ -0,0 +1,70 @@
+"""
+Saving benchmark results as baselines and comparing later runs with them.
+
+Baselines are JSON files in benchmarks/results/: {"benchmark", "created_at",
+"results": {case name: {metric: value}}}.
+"""
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def baseline_path(name):
+    return os.path.join(RESULTS_DIR, f"{name}.json")
+
+
+def save_baseline(name, benchmark, results):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = baseline_path(name)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "benchmark": benchmark,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=4)
+    print(f"💾 Baseline saved to {path}")
+
+
+def load_baseline(name):
+    path = baseline_path(name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Baseline not found at: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results, baseline, metrics, threshold=0.10):
+    """
+    Prints every case's metrics next to the baseline's and returns the
+    regressions: [(case, metric, baseline value, value)].
+    metrics: {metric: True when higher is better, False when lower is}.
+    A change worse than `threshold` (relative) is a regression.
+    """
+    regressions = []
+    baseline_results = baseline["results"]
+
+    print(f"\n=== Compared with baseline of {baseline['created_at']} ===")
+    for case, values in results.items():
+        previous = baseline_results.get(case)
+        if previous is None:
+            print(f"{case}: not in baseline")
+            continue
+
+        for metric, higher_is_better in metrics.items():
+            old, new = previous.get(metric), values.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = "❌" if worse > threshold else "✔"
+            print(f"{flag} {case} {metric}: {old:.4g} → {new:.4g} ({change:+.1%})")
+            if worse > threshold:
+                regressions.append((case, metric, old, new))
+
+    return regressions
@@ -0,0 +1,246 @@
+"""
+End-to-end benchmark of the execution engine.
+
+Runs startEngine.runBackend against the local stub server (stub_server.py)
+on generated scenarios of several depths (APIs per iteration, each taking
+the id from the previous one) and testcase counts, and reports per case:
+requests/s, engine overhead per request (time spent in every phase of the
+run but sending and waiting for responses), peak RSS and the time spent in
+each phase (see profiler.RunProfiler).
+
+    python benchmarks/bench_engine.py                      # 100, 10k, 100k testcases
+    python benchmarks/bench_engine.py --sizes 100 10000 --depths 2 4
+    python benchmarks/bench_engine.py --save-baseline main
+    python benchmarks/bench_engine.py --compare main       # exit code 1 on regression
+
+Every case runs in a fresh process inside a temporary workspace, so peak
+RSS is per case and the repository's configs and results are untouched.
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from baseline import compare, load_baseline, save_baseline
+
+SCENARIO = "Bench"
+
+# metric -> True when higher is better
+METRICS = {"requests_per_s": True, "overhead_us_per_request": False, "peak_rss_mb": False}
+
+
+def build_scenario(depth, testcases, base_url):
+    """
+    Returns (api_config, interactions, testcases, project) of a chain of
+    `depth` APIs: Create, then Get/Update steps, then Delete, each step
+    filtering on the id returned by the previous one.
+    """
+    names = ["Create item"]
+    for step in range(1, depth - 1):
+        names.append(f"{'Get' if step % 2 else 'Update'} item {step}")
+    if depth > 1:
+        names.append("Delete item")
+
+    headers = {"apikey": "{{apiKey}}", "Content-Type": "application/json", "Prefer": "return=representation"}
+    api_config = {}
+    interactions = {}
+    for position, name in enumerate(names):
+        entry = {"url": base_url, "headers": dict(headers), "path": "/rest/v1/items"}
+        if position == 0:
+            entry.update(method="POST", body={"name": "{{name}}", "step": 0})
+        elif name.startswith("Get"):
+            entry.update(method="GET", params={"id": "eq.id"})
+        elif name.startswith("Update"):
+            entry.update(method="PATCH", params={"id": "eq.id"}, body={"step": position})
+        else:
+            entry.update(method="DELETE", params={"id": "eq.id"})
+        api_config[name] = entry
+
+        interaction = {"response": {}, "level": []}
+        if position > 0:
+            upstream = names[position - 1]
+            interaction["level"] = [[upstream]]
+            interaction[upstream] = {"P": ["eq.id"]}
+        interactions[name] = interaction
+
+    rows = {
+        name: [{"{{apiKey}}": "bench-key", "{{name}}": f"item {index}"} for index in range(testcases)]
+        for name in names
+    }
+    project = {"scenarios": {SCENARIO: names}}
+    return api_config, interactions, {SCENARIO: rows}, project
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def stub_process(depth, latency=None):
+    """
+    Runs the stub server of the scenario's APIs in its own process, so it
+    does not compete with the engine for the GIL. Yields its base URL.
+    """
+    port = _free_port()
+    api_config = build_scenario(depth, 0, "")[0]
+    config_file = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+    with config_file:
+        json.dump(api_config, config_file)
+
+    command = [sys.executable, os.path.join(REPO_DIR, "flowtest.py"), "stub", "--config", config_file.name,
+               "--port", str(port), "--ids", "int", "--seed", "1"]
+    if latency:
+        command += ["--latency", latency]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=REPO_DIR)
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise RuntimeError("Stub server did not start")
+                time.sleep(0.05)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait()
+        os.remove(config_file.name)
+
+
+def run_case(case):
+    """
+    Child process side: builds the workspace, runs the scenario and
+    returns the case's measurements.
+    """
+    workspace = tempfile.mkdtemp(prefix="flowtest_bench_")
+    try:
+        api_config, interactions, testcases, project = build_scenario(case["depth"], case["testcases"],
+                                                                     case["base_url"])
+        for folder in ("configs", "interactions", "testcases", "projects"):
+            os.makedirs(os.path.join(workspace, folder))
+        files = {
+            "configs/api_config_new.json": api_config,
+            f"interactions/{SCENARIO}_interactions.json": interactions,
+            "testcases/testcases.json": testcases,
+            "projects/bench.json": project,
+        }
+        for path, data in files.items():
+            with open(os.path.join(workspace, path), "w", encoding="utf-8") as f:
+                json.dump(data, f)
+
+        os.chdir(workspace)
+
+        from main_backend import startEngine
+        from profiler import RunProfiler
+        from progress import SummaryListener
+
+        profiler = RunProfiler()
+        listener = SummaryListener()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            startEngine.runBackend(SCENARIO, listener, "projects/bench.json", None, case["parallel"],
+                                   case["engine"], case["dag"], profiler=profiler)
+            wall = time.perf_counter() - start
+
+        with open(os.path.join("results", f"{SCENARIO}_latency.json"), "r", encoding="utf-8") as f:
+            latency = json.load(f)
+        requests = sum(entry["total"]["count"] for entry in latency["entries"])
+
+        # Time spent in every phase but waiting for responses. Measured per
+        # phase, so idle workers and iterations waiting on the event loop
+        # are not counted as overhead
+        phases = profiler.summary()["phases"]
+        overhead = sum(stats["total_ms"] for phase, stats in phases.items() if phase != "send") / 1000
+
+        return {
+            "requests": requests,
+            "wall_s": round(wall, 3),
+            "requests_per_s": round(requests / wall, 1) if wall else 0,
+            "overhead_us_per_request": round(overhead / requests * 1e6, 1) if requests else None,
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "phases_s": {phase: round(stats["total_ms"] / 1000, 3) for phase, stats in phases.items()},
+            "failed": listener.failed,
+        }
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def case_name(case):
+    name = f"{case['engine']}_d{case['depth']}_n{case['testcases']}_p{case['parallel']}"
+    return name + "_dag" if case["dag"] else name
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of the FlowTest engine")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000], help="Testcase counts (default: 100 10000 100000)")
+    parser.add_argument("--depths", type=int, nargs="+", default=[2, 4, 8], help="APIs per iteration (default: 2 4 8)")
+    parser.add_argument("--engine", choices=("sync", "async"), default="sync", help="Execution engine (default: sync)")
+    parser.add_argument("--parallel-iterations", type=int, default=1, help="Iterations in flight (default: 1)")
+    parser.add_argument("--dag", action="store_true", help="Dependency-graph scheduling")
+    parser.add_argument("--latency", help="Stub latency distribution, e.g. fixed:5 (default: none)")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Save the results as benchmarks/results/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="Compare with benchmarks/results/NAME.json")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression (default: 0.10)")
+    parser.add_argument("--case", help=argparse.SUPPRESS)   # child process
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return 0
+
+    results = {}
+    for depth in args.depths:
+        for size in args.sizes:
+            case = {"depth": depth, "testcases": size, "engine": args.engine,
+                    "parallel": args.parallel_iterations, "dag": args.dag}
+            name = case_name(case)
+            print(f"⏱ {name} ...", flush=True)
+
+            # A fresh stub per case, so rows left by earlier cases do not slow it down
+            with stub_process(depth, args.latency) as base_url:
+                case["base_url"] = base_url
+                output = subprocess.run([sys.executable, os.path.abspath(__file__), "--case", json.dumps(case)],
+                                        capture_output=True, text=True, cwd=REPO_DIR)
+            if output.returncode != 0:
+                print(output.stderr, file=sys.stderr)
+                return 2
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+            results[name] = result
+
+            phases = ", ".join(f"{phase} {seconds}s" for phase, seconds in result["phases_s"].items())
+            print(f"✔ {name}: {result['requests']} requests in {result['wall_s']}s, "
+                  f"{result['requests_per_s']} req/s, overhead {result['overhead_us_per_request']} µs/request, "
+                  f"peak RSS {result['peak_rss_mb']} MB\n    {phases}")
+            if result["failed"]:
+                print(f"⚠ {name}: some testcases failed", file=sys.stderr)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, "bench_engine", results)
+
+    if args.compare:
+        regressions = compare(results, load_baseline(args.compare), METRICS, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+"""
+Micro-benchmarks of the engine's hot functions, with scaling curves.
+
+Each benchmark times one function at growing input sizes and fits the
+growth exponent k of time ~ size^k on a log-log scale: k ≈ 1 is linear, and
+k ≈ 2 shows an O(N²) path. Comparing with a baseline flags slower points
+and a grown exponent, so quadratic paths stay fixed once they are fixed.
+
+    python benchmarks/bench_micro.py
+    python benchmarks/bench_micro.py --only plan_resolve results_store_append
+    python benchmarks/bench_micro.py --quick --save-baseline main
+    python benchmarks/bench_micro.py --compare main       # exit code 1 on regression
+"""
+import argparse
+import contextlib
+import copy
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from baseline import compare, load_baseline, save_baseline
+
+from dependency_resolver import resolve_dependencies_test
+from generate_report import ReportAggregates
+from plan import ExecutionPlan
+from results_store import ResultsStore
+from templates import RequestTemplate
+from utils import find_nested_value, update_result
+
+# metric -> True when higher is better
+METRICS = {"seconds": False}
+EXPONENT_SLACK = 0.25   # growth exponent increase counted as a regression
+
+
+@contextlib.contextmanager
+def workspace():
+    """
+    Runs the block inside an empty temporary working directory.
+    """
+    path = tempfile.mkdtemp(prefix="flowtest_bench_")
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def measure(run, prepare=None, repeat=5):
+    """
+    Best time of `repeat` calls of run(*prepare()), in seconds.
+    prepare() is not timed; it builds fresh arguments for every call.
+    """
+    best = None
+    for _ in range(repeat):
+        args = prepare() if prepare else ()
+        start = time.perf_counter()
+        run(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+# ----- Benchmarks: size -> seconds -----
+
+def _placeholder_config(size):
+    # `size` testcase placeholders spread over headers, params and body
+    third = max(size // 3, 1)
+    api_config = {
+        "method": "POST", "url": "http://localhost", "path": "/items",
+        "headers": {f"h{i}": f"{{{{h{i}}}}}" for i in range(third)},
+        "params": {f"p{i}": f"eq.{{{{p{i}}}}}" for i in range(third)},
+        "body": {f"b{i}": f"{{{{b{i}}}}}" for i in range(third)},
+    }
+    input_values = {f"{{{{{prefix}{i}}}}}": f"value {i}" for prefix in "hpb" for i in range(third)}
+    return api_config, input_values
+
+
+def _upstream_plan(size):
+    # API taking one param from each of `size` upstream APIs
+    api_config = {"API": {
+        "method": "GET", "url": "http://localhost", "path": "/items",
+        "headers": {}, "params": {f"id{i}": f"eq.id{i}" for i in range(size)}, "body": {},
+    }}
+    upstreams = [f"Upstream {i}" for i in range(size)]
+    api_interactions = {"API": {"response": {}, "level": [upstreams]}}
+    for i, upstream in enumerate(upstreams):
+        api_interactions["API"][upstream] = {"P": [f"eq.id{i}"]}
+        api_interactions[upstream] = {"response": {}, "level": []}
+    return api_config, api_interactions, upstreams
+
+
+def bench_template_render(size):
+    api_config, input_values = _placeholder_config(size)
+    template = RequestTemplate(api_config)
+    return measure(lambda: template.render(input_values))
+
+
+def bench_plan_resolve(size):
+    # One call resolving `size` upstream values and its template
+    api_config, api_interactions, upstreams = _upstream_plan(size)
+    plan = ExecutionPlan(api_interactions, api_config)
+
+    def prepare():
+        state = plan.new_iteration()
+        for i, upstream in enumerate(upstreams):
+            state.record(upstream, [{f"id{i}": i + 1, "name": upstream}])
+        return "API", state, None, {}
+
+    return measure(plan.resolve, prepare)
+
+
+def bench_plan_extract(size):
+    # Value in the last of `size` rows, once its path is learned: the rows
+    # before it are still checked, the value must stay the first match
+    plan = ExecutionPlan({"API": {"response": {}, "level": []}}, {})
+    response = [{"name": f"row {i}", "meta": {"tags": ["a", "b"]}} for i in range(size)]
+    response[-1]["meta"]["id"] = size
+    plan.extract("API", "id", response)
+    return measure(lambda: plan.extract("API", "id", response))
+
+
+def _result(index):
+    failed = index % 50 == 0
+    start_ns = index * 10_000_000
+    total_ms = 5 + index % 20
+    return {
+        "status_code": 500 if failed else 200,
+        "body": {"message": "error"} if failed else [{"id": index}],
+        "error": "Internal Server Error" if failed else None,
+        "timing": {"start_ns": start_ns, "end_ns": start_ns + total_ms * 1_000_000,
+                   "total_ms": total_ms, "ttfb_ms": total_ms - 1},
+    }
+
+
+def bench_results_store_append(size):
+    # `size` results appended to a run's results file
+    results = [_result(index) for index in range(size)]
+
+    def run():
+        store = ResultsStore("Bench")
+        for index, result in enumerate(results):
+            store.append("API", index, result)
+        store.close()
+
+    with workspace():
+        return measure(run, repeat=1)
+
+
+def bench_aggregates_record(size):
+    # `size` results counted into the report aggregates
+    results = [_result(index) for index in range(size)]
+    api_config = {"API": {"method": "GET", "url": "http://localhost", "path": "/api"}}
+
+    def run():
+        aggregates = ReportAggregates(api_config)
+        for index, result in enumerate(results):
+            aggregates.record("API", index + 1, result)
+
+    return measure(run, repeat=1)
+
+
+def bench_find_nested_value_deep(size):
+    # Key at the bottom of `size` nested objects
+    data = {"id": 1}
+    for level in range(size):
+        data = {f"level{level}": data, "other": [1, 2, 3]}
+    return measure(lambda: find_nested_value(data, "id"))
+
+
+def bench_find_nested_value_wide(size):
+    # Key in the last of `size` rows
+    data = [{"name": f"row {i}", "meta": {"tags": ["a", "b"]}} for i in range(size)]
+    data[-1]["meta"]["id"] = size
+    return measure(lambda: find_nested_value(data, "id"))
+
+
+def bench_parse_testcases_workbook(size):
+    # `size` testcase rows in 4 API columns
+    from openpyxl import Workbook
+    from utils import parse_testcases_workbook
+
+    with workspace():
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Bench")
+        ws.append([f"API {col}" for col in range(4)])
+        for row in range(size):
+            ws.append([json.dumps({"{{apiKey}}": "key", "{{name}}": f"item {row}", "{{col}}": col})
+                       for col in range(4)])
+        wb.save("testcases.xlsx")
+        return measure(lambda: parse_testcases_workbook("testcases.xlsx"), repeat=1)
+
+
+def _bench_report(size, details):
+    from generate_report import generate_test_report_xlsx
+
+    apis = [f"API {i}" for i in range(4)]
+    with workspace():
+        os.makedirs("configs")
+        with open(os.path.join("configs", "api_config_new.json"), "w") as f:
+            json.dump({api: {"method": "GET", "url": "http://localhost", "path": f"/api{i}"}
+                       for i, api in enumerate(apis)}, f)
+
+        store = ResultsStore("Bench")
+        for index in range(size // len(apis)):
+            for api in apis:
+                store.append(api, index, _result(index))
+        store.close()
+
+        def run():
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                generate_test_report_xlsx("bench", "Bench", output_path="report.xlsx", details=details)
+
+        return measure(run, repeat=1)
+
+
+def bench_report(size):
+    return _bench_report(size, details=False)
+
+
+def bench_report_details(size):
+    return _bench_report(size, details=True)
+
+
+# ----- Legacy paths: dependency_resolver and utils.update_result, which
+# the engine no longer calls (kept to compare with the plan based paths) -----
+
+def bench_resolve_placeholders(size):
+    api_config, input_values = _placeholder_config(size)
+
+    def prepare():
+        return "API", {"API": copy.deepcopy(api_config)}, {"API": {"response": {}, "level": []}}, {}, input_values
+
+    return measure(resolve_dependencies_test, prepare)
+
+
+def bench_resolve_dependencies(size):
+    api_config, api_interactions, upstreams = _upstream_plan(size)
+    for i, upstream in enumerate(upstreams):
+        api_interactions[upstream]["response"] = [{f"id{i}": i + 1, "name": upstream}]
+
+    def prepare():
+        return "API", copy.deepcopy(api_config), copy.deepcopy(api_interactions), {}, {}
+
+    return measure(resolve_dependencies_test, prepare)
+
+
+def bench_update_result(size):
+    # `size` results saved one after the other into a growing results.json
+    response = {"status_code": 200, "body": [{"id": 1, "name": "item"}], "error": None}
+
+    def run():
+        for index in range(size):
+            update_result("Bench", "API", index, response)
+
+    with workspace():
+        return measure(run, repeat=1)
+
+
+# name -> (benchmark, sizes, quick sizes)
+BENCHMARKS = {
+    "template_render": (bench_template_render, [30, 300, 3_000], [30, 300]),
+    "plan_resolve": (bench_plan_resolve, [10, 100, 1_000], [10, 100]),
+    "plan_extract": (bench_plan_extract, [1_000, 10_000, 100_000], [1_000, 10_000]),
+    "find_nested_value_deep": (bench_find_nested_value_deep, [10, 100, 800], [10, 100]),
+    "find_nested_value_wide": (bench_find_nested_value_wide, [1_000, 10_000, 100_000], [1_000, 10_000]),
+    "results_store_append": (bench_results_store_append, [1_000, 10_000, 100_000], [1_000, 10_000]),
+    "aggregates_record": (bench_aggregates_record, [1_000, 10_000, 100_000], [1_000, 10_000]),
+    "parse_testcases_workbook": (bench_parse_testcases_workbook, [100, 1_000, 10_000], [100, 1_000]),
+    "report": (bench_report, [1_000, 10_000, 100_000], [1_000, 10_000]),
+    "report_details": (bench_report_details, [1_000, 10_000, 100_000], [1_000, 10_000]),
+    # Legacy paths, only run with --legacy or --only
+    "resolve_placeholders": (bench_resolve_placeholders, [30, 300, 3_000], [30, 300]),
+    "resolve_dependencies": (bench_resolve_dependencies, [10, 100, 1_000], [10, 100]),
+    "update_result": (bench_update_result, [100, 300, 1_000], [100, 300]),
+}
+LEGACY = {"resolve_placeholders", "resolve_dependencies", "update_result"}
+
+
+def growth_exponent(points):
+    """
+    Least-squares slope of log(seconds) over log(size).
+    """
+    points = [(math.log(size), math.log(seconds)) for size, seconds in points if seconds > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def run_benchmark(name, sizes):
+    benchmark = BENCHMARKS[name][0]
+    points = []
+    for size in sizes:
+        seconds = benchmark(size)
+        points.append((size, seconds))
+        print(f"   {name}[{size}]: {seconds * 1000:.3f} ms ({seconds / size * 1e6:.3f} µs per item)", flush=True)
+
+    exponent = growth_exponent(points)
+    if exponent is not None:
+        shape = "quadratic or worse" if exponent > 1.6 else "superlinear" if exponent > 1.2 else "linear or better"
+        print(f"📈 {name}: time ~ size^{exponent:.2f} ({shape})")
+    return points, exponent
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the FlowTest engine's hot functions")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), metavar="NAME", help=f"Benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes only")
+    parser.add_argument("--legacy", action="store_true", help="Also run the legacy paths the engine no longer calls")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Save the results as benchmarks/results/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="Compare with benchmarks/results/NAME.json")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown counted as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    exponents = {}
+    names = args.only or [name for name in BENCHMARKS if args.legacy or name not in LEGACY]
+    for name in names:
+        _, sizes, quick_sizes = BENCHMARKS[name]
+        print(f"⏱ {name} ...", flush=True)
+        try:
+            points, exponent = run_benchmark(name, quick_sizes if args.quick else sizes)
+        except ImportError as e:
+            print(f"⚠ {name} skipped: {e}")
+            continue
+        for size, seconds in points:
+            results[f"{name}[{size}]"] = {"seconds": seconds}
+        exponents[name] = exponent
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, "bench_micro",
+                      {**results, **{f"{name}[exponent]": {"exponent": k} for name, k in exponents.items()}})
+
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        regressions = compare(results, baseline, METRICS, args.threshold)
+
+        for name, exponent in exponents.items():
+            previous = baseline["results"].get(f"{name}[exponent]", {}).get("exponent")
+            if previous is None or exponent is None:
+                continue
+            worse = exponent - previous > EXPONENT_SLACK
+            print(f"{'❌' if worse else '✔'} {name} exponent: {previous:.2f} → {exponent:.2f}")
+            if worse:
+                regressions.append((name, "exponent", previous, exponent))
+
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s)")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Record-and-replay of a run's HTTP traffic.
+
+A cassette is a gzip compressed JSONL file with one recorded exchange per
+line. RecordingTransport wraps the run's transport and saves every
+request/response pair; ReplayTransport answers requests from a cassette
+without any network access, so scenarios can be rerun offline and without
+server latency.
+"""
+import base64
+import gzip
+import json
+import os
+import threading
+import time
+
+import requests
+
+from transport import AsyncResponse, build_timing
+
+
+def request_key(api_data):
+    """
+    Identifies a request for replay: method, URL, query params and body.
+    Headers are left out so that changed keys or tokens still match.
+    """
+    return json.dumps([
+        api_data["method"].upper(),
+        api_data["url"] + api_data["path"],
+        sorted((str(key), str(value)) for key, value in (api_data.get("params") or {}).items()),
+        api_data.get("body") or {},
+    ], sort_keys=True, separators=(",", ":"))
+
+
+class CassetteWriter:
+    """
+    Appends recorded exchanges to a cassette. Lines go to a temporary file
+    that close() moves over `path`, as results_store.ResultsStore does.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(self.tmp_path, "wt", encoding="utf-8")
+
+    def record(self, api_data, response):
+        content = response.content or b""
+        try:
+            encoded = {"text": content.decode("utf-8")}
+        except UnicodeDecodeError:
+            encoded = {"base64": base64.b64encode(content).decode("ascii")}
+
+        line = json.dumps({
+            "key": request_key(api_data),
+            "status_code": response.status_code,
+            "reason": response.reason,
+            **encoded,
+        }, separators=(",", ":"))
+
+        with self._lock:
+            self._file.write(line + "\n")
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.close()
+            os.replace(self.tmp_path, self.path)
+
+
+def load_cassette(path):
+    """
+    Reads a cassette into {request key: [recorded response, ...]} in
+    recording order.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Cassette not found at: {path}")
+
+    exchanges = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            exchange = json.loads(line)
+            if "base64" in exchange:
+                content = base64.b64decode(exchange["base64"])
+            else:
+                content = exchange["text"].encode("utf-8")
+            exchanges.setdefault(exchange["key"], []).append(
+                (exchange["status_code"], exchange["reason"], content)
+            )
+    return exchanges
+
+
+class RecordingTransport:
+    """
+    Sends through `transport` (a transport.Transport) and records every
+    answered request into the cassette at `path`.
+    """
+
+    def __init__(self, transport, path):
+        self.transport = transport
+        self.writer = CassetteWriter(path)
+
+    def send(self, api_data):
+        response = self.transport.send(api_data)
+        self.writer.record(api_data, response)
+        return response
+
+    def stats(self):
+        return self.transport.stats()
+
+    def print_stats(self):
+        self.transport.print_stats()
+        print(f"📼 Recorded {self.writer.count} requests to {self.writer.path}")
+
+    def close(self):
+        self.transport.close()
+        self.writer.close()
+
+
+class AsyncRecordingTransport(RecordingTransport):
+    """
+    RecordingTransport around a transport.AsyncTransport.
+    """
+
+    async def send(self, api_data):
+        response = await self.transport.send(api_data)
+        self.writer.record(api_data, response)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+        self.writer.close()
+
+
+class ReplayTransport:
+    """
+    Answers requests from the cassette at `path` without network access.
+
+    Identical requests get the recorded responses in recording order and
+    start over once all were replayed, so a short recording can serve a
+    longer run. A request that was never recorded raises
+    requests.exceptions.ConnectionError, which make_request reports like an
+    unreachable server.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.exchanges = load_cassette(path)
+        self.replayed = 0
+        self.unmatched = 0
+        self._positions = {}   # request key -> next recorded response
+        self._lock = threading.Lock()
+
+    def send(self, api_data):
+        start_ns = time.perf_counter_ns()
+        key = request_key(api_data)
+
+        with self._lock:
+            recorded = self.exchanges.get(key)
+            if not recorded:
+                self.unmatched += 1
+                raise requests.exceptions.ConnectionError(
+                    f"No recorded response for {api_data['method']} {api_data['url'] + api_data['path']} in {self.path}"
+                )
+            position = self._positions.get(key, 0)
+            self._positions[key] = (position + 1) % len(recorded)
+            self.replayed += 1
+
+        status_code, reason, content = recorded[position]
+        end_ns = time.perf_counter_ns()
+        timing = build_timing(start_ns, end_ns, end_ns, request_bytes=len(key), response_bytes=len(content),
+                              connection_reused=True)
+        return AsyncResponse(status_code, reason, content, "utf-8", timing)
+
+    def stats(self):
+        return {"replayed": self.replayed, "unmatched": self.unmatched}
+
+    def print_stats(self):
+        print(f"📼 Replayed {self.replayed} requests from {self.path}, {self.unmatched} without a recording")
+
+    def close(self):
+        pass
+
+
+class AsyncReplayTransport(ReplayTransport):
+    """
+    ReplayTransport for the asyncio engine.
+    """
+
+    async def send(self, api_data):
+        return ReplayTransport.send(self, api_data)
+
+    async def aclose(self):
+        pass
@@ -1,86 +1,377 @@
-import requests
-# from dependency_resolver import resolve_dependencies
-from dependency_resolver import resolve_dependencies_test
 from request_handler import make_request
 from utils import load_test_case_data
-import json
-from utils import update_response
-from PyQt5.QtWidgets import QApplication
-import copy
-from datetime import datetime
-from generate_report import generate_test_report_xlsx
+from results_store import ResultsStore
+from sketch import latency_path_for
+from progress import ProgressListener
+from progress import RunCancelled
+from plan import get_execution_plan
+from scheduler import build_dependency_graph
+from scheduler import run_graph
+from concurrent.futures import ThreadPoolExecutor
+from generate_report import ReportAggregates, generate_test_report_xlsx
+from metrics import Metrics
+from profiler import Profiler
 import os
+import time
 
-def execute_api_sequence(api_config, env_config, api_interactions, scenario_name, api_blocks, project_path):
+def to_safe_response(response):
+    """
+    Converts an HTTP response into the JSON-serializable result stored per
+    testcase. Returns (safe_response, success).
 
-    sequence = [api for api in api_interactions.keys() if api != "ENV"]
-    test_case_data = load_test_case_data("testcases/testcases.json")[scenario_name]
+    `response` may also be the error message make_request returns when the
+    request could not be sent. Responses from the transports carry a
+    "timing" entry (see transport.build_timing).
+    """
+    if isinstance(response, str):
+        return {"status_code": None, "body": None, "error": response, "timing": None}, False
+
+    safe_response = {
+        "status_code": response.status_code,
+        "body": None,
+        "error": None,
+        "timing": getattr(response, "timing", None)
+    }
+
+    if response:
+        try:
+            # Try JSON first
+            safe_response["body"] = response.json()
+        except Exception:
+            # Fallback to raw text (401/404 HTML etc.)
+            safe_response["body"] = response.text or ""
+            safe_response["error"] = response.reason or "Unknown"
+    else:
+        safe_response["error"] = "No response from server"
+
+    success = bool(response and response.content)
+    return safe_response, success
+
+
+def skipped_response(upstream_api):
+    """
+    Result stored for a call that was not sent because an API it takes
+    values from failed earlier in the iteration.
+    """
+    return {"status_code": None, "body": None, "error": "skipped: upstream failed", "timing": None,
+            "skipped_by": upstream_api}
+
+
+def is_failed_response(safe_response):
+    """
+    True when dependents of this call cannot get their values from it: no
+    response, an error status or a skipped call.
+    """
+    status_code = safe_response["status_code"]
+    return status_code is None or status_code >= 400
+
+
+def skip_if_upstream_failed(ctx, api_name, test_index, state):
+    """
+    Returns the skipped result of api_name's next call when the iteration's
+    fixtures could not be resolved or, with ctx.fail_fast, when one of its
+    upstream APIs failed in this iteration (the call's interaction level is
+    consumed as if it was sent), else None.
+    """
+    upstream_api = state.failed_fixture
+    if upstream_api is None:
+        if not ctx.fail_fast:
+            return None
+        upstream_api = state.failed_upstream(api_name)
+        if upstream_api is None:
+            return None
+
+    if ctx.verbose:
+        print(f"⏭ Skipping {api_name} testcase {test_index+1}: upstream {upstream_api} failed")
+    ctx.profiler.mark(f"{api_name} skipped", {"iteration": test_index + 1, "upstream": upstream_api})
+    ctx.metrics.request_skipped(api_name)
+
+    ctx.plan.next_steps(api_name, state.cursors)
+    state.set_failed(api_name, True)
+    return skipped_response(upstream_api)
 
-    max_test_count = max(len(test_case_data.get(api, [])) for api in sequence)
-    success_tracker = {api: 0 for api in sequence}
 
-    print(f"Total Test Iterations = {max_test_count}")
+def resolve_fixtures(ctx):
+    """
+    Returns the scenario's fixture values and None, sending the fixture
+    calls whose values are not cached, or ({}, fixture name) when a fixture
+    failed.
+    """
+    def send(fixture_name, api_data):
+        ctx.metrics.request_started(fixture_name)
+        with ctx.profiler.phase("fixture"):
+            safe_response, _ = to_safe_response(make_request(api_data, ctx.transport))
+        ctx.metrics.request_finished(fixture_name, safe_response)
+        return safe_response
 
-    for test_index in range(max_test_count):
-        print(f"\n=== Test Iteration {test_index+1}/{max_test_count} ===")
+    return ctx.fixtures.values(send, ctx.verbose)
 
-        copy_api_interactions = copy.deepcopy(api_interactions)
 
-        for api_index, api_name in enumerate(sequence):
+def should_refresh_fixtures(ctx, safe_response):
+    """
+    True when the call's status means its fixture values were rejected
+    (e.g. an expired token, see the fixtures' refresh_on).
+    """
+    return ctx.fixtures is not None and safe_response["status_code"] in ctx.fixtures.refresh_statuses
 
-            if test_index >= len(test_case_data.get(api_name, [])):
-                print(f"⚠ No testcase #{test_index+1} for {api_name}, skipping...")
-                continue
 
-            print(f"→ Executing: {api_name} testcase {test_index+1}")
+def call_inputs(ctx, api_name, test_index, fixture_values):
+    """
+    Testcase inputs of a call: the fixture values overridden by the
+    testcase's own.
+    """
+    input_values = ctx.test_case_data[api_name][test_index]
+    if fixture_values:
+        return {**fixture_values, **input_values}
+    return input_values
 
-            api_block = api_blocks[api_index]
-            api_block.set_progress(f"Executing {test_index + 1}/{max_test_count} ...")
 
-            # Prepare input data
-            input_values = test_case_data[api_name][test_index]
-            api_data = resolve_dependencies_test(api_name, api_config, copy_api_interactions, env_config, input_values)
+class RunContext:
+    """
+    What every iteration of a run shares: the API sequence, the compiled
+    plan, the testcase data and the run's transport and listener.
+    `graph` / `api_executor` are set for dependency-graph scheduling,
+    `verbose` controls the per-call console lines, `fail_fast` skips calls
+    whose upstream API failed in the iteration, `profiler` times the
+    phases of every call (see profiler.RunProfiler), `metrics` counts
+    them for scrapers (see metrics.RunMetrics) and `fixtures` (a
+    fixtures.FixtureSet) provides the values of the scenario's setup calls.
+    """
 
-            # Send request
-            response = make_request(api_data)
+    def __init__(self, sequence, plan, test_case_data, listener=None, transport=None, env_config=None,
+                 graph=None, api_executor=None, verbose=True, fail_fast=True, profiler=None, metrics=None,
+                 fixtures=None):
+        self.sequence = sequence
+        self.plan = plan
+        self.test_case_data = test_case_data
+        self.listener = listener if listener is not None else ProgressListener()
+        self.transport = transport
+        self.env_config = env_config
+        self.graph = graph
+        self.api_executor = api_executor
+        self.verbose = verbose
+        self.fail_fast = fail_fast
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.fixtures = fixtures
 
-            safe_response = {
-                "status_code": response.status_code,
-                "body": None,
-                "error": None
-            }
+        self.api_indices = {api_name: api_index for api_index, api_name in enumerate(sequence)}
+        self.max_test_count = max((len(test_case_data.get(api, [])) for api in sequence), default=0)
 
-            if response:
-                try:
-                    # Try JSON first
-                    safe_response["body"] = response.json()
-                except Exception:
-                    # Fallback to raw text (401/404 HTML etc.)
-                    safe_response["body"] = response.text or ""
-                    safe_response["error"] = response.reason or "Unknown"
+
+def send_api(ctx, api_name, test_index, state, fixture_values):
+    """
+    Resolves (through the compiled plan) and sends api_name's next call.
+    Returns (safe_response, success).
+    """
+    profiler = ctx.profiler
+    input_values = call_inputs(ctx, api_name, test_index, fixture_values)
+    with profiler.phase("resolve"):
+        api_data = ctx.plan.resolve(api_name, state, ctx.env_config, input_values)
+
+    ctx.metrics.request_started(api_name)
+    with profiler.phase("send"):
+        response = make_request(api_data, ctx.transport)
+
+    with profiler.phase("decode"):
+        safe_response, success = to_safe_response(response)
+    ctx.metrics.request_finished(api_name, safe_response)
+    return safe_response, success
+
+
+def run_api(ctx, api_name, test_index, state):
+    """
+    Resolves (through the compiled plan), sends and records one API call of
+    an iteration.
+    Returns (api_name, safe_response, success), or None when the API has no
+    testcase for this iteration. Raises progress.RunCancelled when the run's
+    listener asked to stop.
+    """
+    if test_index >= len(ctx.test_case_data.get(api_name, [])):
+        if ctx.verbose:
+            print(f"⚠ No testcase #{test_index+1} for {api_name}, skipping...")
+        return None
+
+    if ctx.listener.cancelled():
+        raise RunCancelled()
+
+    skipped = skip_if_upstream_failed(ctx, api_name, test_index, state)
+    if skipped is not None:
+        return api_name, skipped, False
+
+    if ctx.verbose:
+        print(f"→ Executing: {api_name} testcase {test_index+1}")
+
+    profiler = ctx.profiler
+    with profiler.span(api_name, "call", args={"iteration": test_index + 1}):
+        with profiler.phase("notify"):
+            ctx.listener.on_progress(ctx.api_indices[api_name], api_name, test_index, ctx.max_test_count)
+
+        position = state.cursors.get(api_name, 0)
+        fixture_values = state.inputs
+        safe_response, success = send_api(ctx, api_name, test_index, state, fixture_values)
+
+        # Fixture values rejected: refresh them and send the call once more
+        if should_refresh_fixtures(ctx, safe_response):
+            ctx.fixtures.invalidate(safe_response["status_code"], fixture_values)
+            fixture_values, failed_fixture = resolve_fixtures(ctx)
+            if failed_fixture is None:
+                # Replaced, never changed: concurrent calls (dag) read either dict
+                state.inputs = fixture_values
+                state.cursors[api_name] = position
+                ctx.metrics.retried(api_name)
+                safe_response, success = send_api(ctx, api_name, test_index, state, fixture_values)
             else:
-                safe_response["error"] = "No response from server"
+                # The iteration's calls not yet sent are skipped
+                state.failed_fixture = failed_fixture
+
+        # Later APIs of this iteration resolve their dependencies from here
+        with profiler.phase("extract"):
+            state.record(api_name, safe_response)
+        state.set_failed(api_name, is_failed_response(safe_response))
+
+    return api_name, safe_response, success
+
 
+def run_iteration(ctx, test_index):
+    """
+    Runs one test iteration over the API sequence with its own
+    plan.IterationState. Returns [(api_name, safe_response, success), ...] in
+    sequence order; persisting them is left to the caller.
 
-            if response and response.content:
-                success_tracker[api_name] += 1
-            
+    With a dependency graph (see scheduler.build_dependency_graph) the APIs
+    are sent on ctx.api_executor as soon as their upstream responses arrived,
+    otherwise strictly in sequence order.
+    """
+    if ctx.verbose:
+        print(f"\n=== Test Iteration {test_index+1}/{ctx.max_test_count} ===")
 
-            update_response(scenario_name, api_name, copy_api_interactions, safe_response, test_index)
+    state = ctx.plan.new_iteration()
 
-            QApplication.processEvents()
+    def call(api_name):
+        return run_api(ctx, api_name, test_index, state)
+
+    with ctx.profiler.span(f"Iteration {test_index+1}", "iteration"):
+        if ctx.fixtures is not None:
+            state.inputs, state.failed_fixture = resolve_fixtures(ctx)
+
+        if ctx.graph is None:
+            api_results = {api_name: call(api_name) for api_name in ctx.sequence}
+        else:
+            started_ns = time.perf_counter_ns()
+
+            def call_when_ready(api_name):
+                # Time from the iteration's start until the API could be sent
+                upstream = ctx.graph[api_name]
+                if upstream:
+                    ctx.profiler.wait(f"{api_name} waits on {', '.join(sorted(upstream))}", started_ns,
+                                      {"iteration": test_index + 1})
+                return call(api_name)
+
+            api_results = run_graph(ctx.sequence, ctx.graph, call_when_ready, ctx.api_executor)
+
+    ctx.metrics.iteration_finished()
+
+    return [api_results[api_name] for api_name in ctx.sequence if api_results.get(api_name) is not None]
+
+
+def execute_api_sequence(api_config, env_config, api_interactions, scenario_name, listener, project_path, transport=None, parallel_iterations=1, dag=False, respect_order=None, plan=None, report_details=False, fail_fast=True, profiler=None, metrics=None, fixtures=None, verbose=True):
+    """
+    Runs every testcase iteration of the scenario. With parallel_iterations > 1
+    the iterations run on a thread pool; results are still persisted in
+    iteration order.
+
+    dag=True sends independent APIs of an iteration concurrently following
+    the interaction levels; respect_order keeps declared order for APIs with
+    side effects (True for all APIs, or a collection of API names).
+
+    `plan` is the scenario's compiled plan.ExecutionPlan, compiled (and
+    cached) from api_interactions when omitted. report_details=True adds the
+    per-testcase sheet to the report.
+
+    With fail_fast, calls that take values from an API that failed earlier
+    in the iteration are not sent and are recorded as
+    "skipped: upstream failed".
+
+    `profiler` (a profiler.Profiler) times the phases of the run and
+    `metrics` (a metrics.Metrics) counts its calls. `fixtures` (a
+    fixtures.FixtureSet) resolves the scenario's setup calls, whose values
+    every call takes as testcase inputs. verbose=False silences the
+    console lines of the run.
+    """
+
+    if listener is None:
+        listener = ProgressListener()
+    if profiler is None:
+        profiler = Profiler()
+
+    if plan is None:
+        plan = get_execution_plan(api_interactions, api_interactions, api_config)
+
+    sequence = [api for api in api_interactions.keys() if api != "ENV"]
+    test_case_data = load_test_case_data("testcases/testcases.json")[scenario_name]
+
+    ctx = RunContext(sequence, plan, test_case_data, listener, transport, env_config, verbose=verbose,
+                     fail_fast=fail_fast, profiler=profiler, metrics=metrics, fixtures=fixtures)
+    max_test_count = ctx.max_test_count
+    success_tracker = {api: 0 for api in sequence}
+
+    if dag:
+        ctx.graph = build_dependency_graph(api_interactions, sequence, respect_order)
+        # Separate from the iteration pool: iteration threads block on API futures
+        ctx.api_executor = ThreadPoolExecutor(max_workers=max(parallel_iterations, 1) * len(sequence),
+                                              thread_name_prefix="api")
+
+    if ctx.verbose:
+        print(f"Total Test Iterations = {max_test_count}")
+    with profiler.phase("notify"):
+        listener.on_run_start(sequence, max_test_count)
+
+    if parallel_iterations > 1:
+        executor = ThreadPoolExecutor(max_workers=parallel_iterations, thread_name_prefix="iteration")
+        # map() yields in submission order, whatever order iterations finish in
+        all_results = executor.map(lambda test_index: run_iteration(ctx, test_index), range(max_test_count))
+    else:
+        executor = None
+        all_results = (run_iteration(ctx, test_index) for test_index in range(max_test_count))
+
+    # Report figures, kept up to date as results arrive
+    aggregates = ReportAggregates(api_config)
+
+    finished = False
+    try:
+        with ResultsStore(scenario_name) as store:
+            for test_index, iteration_results in enumerate(all_results):
+                for api_name, safe_response, success in iteration_results:
+                    if success:
+                        success_tracker[api_name] += 1
+                    with profiler.phase("persist"):
+                        store.append(api_name, test_index, safe_response)
+                        aggregates.record(api_name, test_index + 1, safe_response)
+        finished = True
+    finally:
+        # On errors, queued iterations are dropped instead of sending their requests
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=not finished)
+        if ctx.api_executor is not None:
+            ctx.api_executor.shutdown(wait=True, cancel_futures=not finished)
     
     # Final UI Status
     for i, api_name in enumerate(sequence):
         total_cases = len(test_case_data.get(api_name, []))
-        passed = (success_tracker[api_name] == total_cases)
-        fail_count = total_cases-success_tracker[api_name]
-        api_blocks[i].set_status(success_tracker[api_name],fail_count)
-        print(f"✔ {api_name}: Passed {success_tracker[api_name]}/{total_cases}")
+        skipped = aggregates.skipped_count(api_name)
+        fail_count = total_cases-success_tracker[api_name]-skipped
+        with profiler.phase("notify"):
+            listener.on_status(i, api_name, success_tracker[api_name], fail_count, skipped)
+        skipped_note = f", skipped {skipped} (upstream failed)" if skipped else ""
+        print(f"✔ {api_name}: Passed {success_tracker[api_name]}/{total_cases}{skipped_note}")
+
+    aggregates.latency.save(latency_path_for(scenario_name))
 
     project_name = os.path.splitext(os.path.basename(project_path))[0]
-    generate_test_report_xlsx(project_name,scenario_name)
+    with profiler.phase("report"):
+        generate_test_report_xlsx(project_name,scenario_name, details=report_details, aggregates=aggregates)
+    with profiler.phase("notify"):
+        listener.on_run_end()
 
     return api_interactions
-
-
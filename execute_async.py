@@ -0,0 +1,220 @@
+import asyncio
+import os
+
+from execute import RunContext
+from execute import call_inputs
+from execute import is_failed_response
+from execute import should_refresh_fixtures
+from execute import skip_if_upstream_failed
+from execute import to_safe_response
+from generate_report import ReportAggregates, generate_test_report_xlsx
+from plan import get_execution_plan
+from profiler import Profiler
+from progress import ProgressListener
+from progress import RunCancelled
+from results_store import ResultsStore
+from sketch import latency_path_for
+from utils import load_test_case_data
+
+
+async def make_request_async(api_data, transport):
+    """
+    asyncio version of request_handler.make_request.
+    """
+    url = api_data["url"] + api_data["path"]
+
+    try:
+        return await transport.send(api_data)
+    except Exception as e:
+        print(f"Error calling {url}: {e}")
+        return f"Error calling {url}: {e}"
+
+
+async def resolve_fixtures_async(ctx):
+    """
+    asyncio version of execute.resolve_fixtures.
+    """
+    async def send(fixture_name, api_data):
+        ctx.metrics.request_started(fixture_name)
+        with ctx.profiler.phase("fixture"):
+            safe_response, _ = to_safe_response(await make_request_async(api_data, ctx.transport))
+        ctx.metrics.request_finished(fixture_name, safe_response)
+        return safe_response
+
+    return await ctx.fixtures.values_async(send, ctx.verbose)
+
+
+async def send_api_async(ctx, api_name, test_index, state, fixture_values):
+    """
+    asyncio version of execute.send_api.
+    """
+    profiler = ctx.profiler
+    input_values = call_inputs(ctx, api_name, test_index, fixture_values)
+    with profiler.phase("resolve"):
+        api_data = ctx.plan.resolve(api_name, state, ctx.env_config, input_values)
+
+    # Includes the time other iterations run on the loop before this one resumes
+    ctx.metrics.request_started(api_name)
+    with profiler.phase("send"):
+        response = await make_request_async(api_data, ctx.transport)
+    with profiler.phase("decode"):
+        safe_response, success = to_safe_response(response)
+    ctx.metrics.request_finished(api_name, safe_response)
+    return safe_response, success
+
+
+async def run_iteration_async(ctx, test_index):
+    """
+    asyncio version of execute.run_iteration: the APIs of one iteration still
+    run in sequence, other iterations progress while this one awaits.
+    ctx is an execute.RunContext whose transport is an AsyncTransport.
+    """
+    if ctx.verbose:
+        print(f"\n=== Test Iteration {test_index+1}/{ctx.max_test_count} ===")
+
+    state = ctx.plan.new_iteration()
+    iteration_results = []
+    profiler = ctx.profiler
+
+    # Iterations share the event loop's thread, so each gets its own trace track
+    with profiler.span(f"Iteration {test_index+1}", "iteration", track=f"Iteration {test_index+1}"):
+        if ctx.fixtures is not None:
+            state.inputs, state.failed_fixture = await resolve_fixtures_async(ctx)
+
+        for api_index, api_name in enumerate(ctx.sequence):
+
+            if test_index >= len(ctx.test_case_data.get(api_name, [])):
+                if ctx.verbose:
+                    print(f"⚠ No testcase #{test_index+1} for {api_name}, skipping...")
+                continue
+
+            if ctx.listener.cancelled():
+                raise RunCancelled()
+
+            skipped = skip_if_upstream_failed(ctx, api_name, test_index, state)
+            if skipped is not None:
+                iteration_results.append((api_name, skipped, False))
+                continue
+
+            if ctx.verbose:
+                print(f"→ Executing: {api_name} testcase {test_index+1}")
+
+            with profiler.span(api_name, "call", args={"iteration": test_index + 1}):
+                with profiler.phase("notify"):
+                    ctx.listener.on_progress(api_index, api_name, test_index, ctx.max_test_count)
+
+                position = state.cursors.get(api_name, 0)
+                fixture_values = state.inputs
+                safe_response, success = await send_api_async(ctx, api_name, test_index, state, fixture_values)
+
+                # Fixture values rejected: refresh them and send the call once more
+                if should_refresh_fixtures(ctx, safe_response):
+                    ctx.fixtures.invalidate(safe_response["status_code"], fixture_values)
+                    fixture_values, failed_fixture = await resolve_fixtures_async(ctx)
+                    if failed_fixture is None:
+                        state.inputs = fixture_values
+                        state.cursors[api_name] = position
+                        ctx.metrics.retried(api_name)
+                        safe_response, success = await send_api_async(ctx, api_name, test_index, state, fixture_values)
+                    else:
+                        # The iteration's calls not yet sent are skipped
+                        state.failed_fixture = failed_fixture
+
+                with profiler.phase("extract"):
+                    state.record(api_name, safe_response)
+                state.set_failed(api_name, is_failed_response(safe_response))
+
+            iteration_results.append((api_name, safe_response, success))
+
+    ctx.metrics.iteration_finished()
+    return iteration_results
+
+
+async def execute_api_sequence_async(api_config, env_config, api_interactions, scenario_name, listener, project_path, transport, concurrency=100, plan=None, report_details=False, fail_fast=True, profiler=None, metrics=None, fixtures=None, verbose=True):
+    """
+    asyncio engine with the same inputs and outputs as
+    execute.execute_api_sequence. Up to `concurrency` iterations are in
+    flight at once on a single event loop.
+    """
+
+    if listener is None:
+        listener = ProgressListener()
+    if profiler is None:
+        profiler = Profiler()
+
+    if plan is None:
+        plan = get_execution_plan(api_interactions, api_interactions, api_config)
+
+    sequence = [api for api in api_interactions.keys() if api != "ENV"]
+    test_case_data = load_test_case_data("testcases/testcases.json")[scenario_name]
+
+    ctx = RunContext(sequence, plan, test_case_data, listener, transport, env_config, verbose=verbose,
+                     fail_fast=fail_fast, profiler=profiler, metrics=metrics, fixtures=fixtures)
+    max_test_count = ctx.max_test_count
+    success_tracker = {api: 0 for api in sequence}
+
+    if ctx.verbose:
+        print(f"Total Test Iterations = {max_test_count}")
+    with profiler.phase("notify"):
+        listener.on_run_start(sequence, max_test_count)
+
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def iteration(test_index):
+        async with semaphore:
+            return await run_iteration_async(ctx, test_index)
+
+    tasks = [asyncio.ensure_future(iteration(test_index)) for test_index in range(max_test_count)]
+
+    # Report figures, kept up to date as results arrive
+    aggregates = ReportAggregates(api_config)
+
+    try:
+        with ResultsStore(scenario_name) as store:
+            # Awaiting in submission order keeps results in iteration order
+            for test_index, task in enumerate(tasks):
+                for api_name, safe_response, success in await task:
+                    if success:
+                        success_tracker[api_name] += 1
+                    with profiler.phase("persist"):
+                        store.append(api_name, test_index, safe_response)
+                        aggregates.record(api_name, test_index + 1, safe_response)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    for i, api_name in enumerate(sequence):
+        total_cases = len(test_case_data.get(api_name, []))
+        skipped = aggregates.skipped_count(api_name)
+        fail_count = total_cases-success_tracker[api_name]-skipped
+        with profiler.phase("notify"):
+            listener.on_status(i, api_name, success_tracker[api_name], fail_count, skipped)
+        skipped_note = f", skipped {skipped} (upstream failed)" if skipped else ""
+        print(f"✔ {api_name}: Passed {success_tracker[api_name]}/{total_cases}{skipped_note}")
+
+    aggregates.latency.save(latency_path_for(scenario_name))
+
+    project_name = os.path.splitext(os.path.basename(project_path))[0]
+    with profiler.phase("report"):
+        generate_test_report_xlsx(project_name,scenario_name, details=report_details, aggregates=aggregates)
+    with profiler.phase("notify"):
+        listener.on_run_end()
+
+    return api_interactions
+
+
+def run_api_sequence_async(api_config, env_config, api_interactions, scenario_name, listener, project_path, transport, concurrency=100, plan=None, report_details=False, fail_fast=True, profiler=None, metrics=None, fixtures=None, verbose=True):
+    """
+    Runs execute_api_sequence_async on a fresh event loop and closes the
+    transport's sessions on that loop.
+    """
+
+    async def run():
+        try:
+            return await execute_api_sequence_async(api_config, env_config, api_interactions, scenario_name,
+                                                    listener, project_path, transport, concurrency, plan, report_details, fail_fast,
+                                                    profiler, metrics, fixtures, verbose)
+        finally:
+            await transport.aclose()
+
+    return asyncio.run(run())
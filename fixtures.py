@@ -0,0 +1,252 @@
+"""
+Scenario fixtures: setup calls (a login, a tenant lookup) whose extracted
+values every call of the scenario takes as testcase inputs.
+
+fixtures/<scenario>_fixtures.json maps fixture names to definitions, run in
+file order (later fixtures can use the values of earlier ones):
+
+    {
+        "Login": {
+            "api": "Login",
+            "scope": "run",
+            "inputs": {"{{email}}": "qa@example.com", "{{password}}": "secret"},
+            "extract": {"{{token}}": "access_token"},
+            "expires_in": "expires_in",
+            "refresh_on": [401]
+        },
+        "Keys": {"values": {"{{apiKey}}": "..."}}
+    }
+
+api: API of configs/api_config_new.json to call (defaults to the name).
+scope: "run" (one call shared by the whole run), "worker" (one per thread:
+a virtual user, an iteration thread; the async engine has a single one)
+or "iteration" (one per iteration).
+extract: {placeholder: key searched in the response body}.
+expires_in: lifetime in seconds, or the response key holding it (OAuth
+"expires_in"). Values are refreshed `refresh_before` seconds (default 30,
+at most half the lifetime) before they expire.
+refresh_on: status codes of a scenario call that mean the values were
+rejected; they are refreshed and the call is sent once more.
+values: static values, for fixtures without an API call.
+"""
+import asyncio
+import contextlib
+import json
+import os
+import threading
+import time
+
+from templates import RequestTemplate
+from utils import find_nested_value
+
+SCOPES = ("run", "worker", "iteration")
+
+_NO_LOCK = contextlib.nullcontext()
+
+
+def fixtures_path_for(scenario_name, fixtures_dir="fixtures"):
+    """
+    Path of the fixtures of a scenario: fixtures/<scenario>_fixtures.json
+    """
+    return os.path.join(fixtures_dir, f"{scenario_name}_fixtures.json")
+
+
+class FixtureValues:
+    """
+    Values a fixture resolved to, with their monotonic expiry time (None
+    when they never expire).
+    """
+
+    __slots__ = ("values", "expires_at")
+
+    def __init__(self, values, expires_at=None):
+        self.values = values
+        self.expires_at = expires_at
+
+    def fresh(self, now):
+        return self.expires_at is None or now < self.expires_at
+
+
+class Fixture:
+    """
+    One fixture definition, with the request template of its API compiled.
+    """
+
+    def __init__(self, name, definition, api_config):
+        self.name = name
+        self.scope = definition.get("scope", "run")
+        if self.scope not in SCOPES:
+            raise ValueError(f"Fixture '{name}': unknown scope '{self.scope}', expected one of {', '.join(SCOPES)}")
+
+        self.static_values = dict(definition.get("values", {}))
+        self.inputs = dict(definition.get("inputs", {}))
+        self.extract = dict(definition.get("extract", {}))
+        self.expires_in = definition.get("expires_in")
+        self.refresh_before = float(definition.get("refresh_before", 30))
+        self.refresh_on = frozenset(definition.get("refresh_on", ()))
+
+        # Fixtures with only static values call no API
+        self.api = definition.get("api", None if set(definition) <= {"values", "scope"} else name)
+        self.template = None
+        if self.api is not None:
+            if self.api not in api_config:
+                raise ValueError(f"Fixture '{name}': API '{self.api}' is not in the API config")
+            self.template = RequestTemplate(api_config[self.api])
+        self.static_entry = FixtureValues(self.static_values) if self.template is None else None
+
+    def request_data(self, values):
+        """
+        Request data of the fixture's call; `values` are the values of the
+        fixtures resolved before this one.
+        """
+        return self.template.render({**values, **self.inputs})
+
+    def _lifetime(self, body):
+        if isinstance(self.expires_in, str):
+            lifetime = find_nested_value(body, self.expires_in)
+        else:
+            lifetime = self.expires_in
+        try:
+            return float(lifetime) if lifetime is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def resolved(self, safe_response, now):
+        """
+        FixtureValues from the fixture call's response, or (None, reason)
+        when the call failed or a value is missing.
+        """
+        status_code = safe_response["status_code"]
+        if status_code is None or status_code >= 400:
+            return None, safe_response["error"] or f"status {status_code}"
+
+        body = safe_response["body"]
+        values = dict(self.static_values)
+        for placeholder, key in self.extract.items():
+            value = find_nested_value(body, key)
+            if value is None:
+                return None, f"no '{key}' in the response"
+            values[placeholder] = value
+
+        expires_at = None
+        lifetime = self._lifetime(body)
+        if lifetime is not None:
+            expires_at = now + lifetime - min(self.refresh_before, lifetime / 2)
+        return FixtureValues(values, expires_at), None
+
+
+class FixtureSet:
+    """
+    The fixtures of a scenario and their cached values: one entry per run,
+    per thread (worker) or none (iteration, resolved every time).
+
+    values() / values_async() take `send(fixture_name, request_data)`
+    returning the call's safe_response (see execute.to_safe_response) and
+    return ({placeholder: value}, None), or ({}, fixture name) when a
+    fixture could not be resolved.
+    """
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self.refresh_statuses = frozenset().union(*(fixture.refresh_on for fixture in fixtures))
+        self._run_cache = {}   # fixture name -> FixtureValues
+        self._local = threading.local()   # .cache: fixture name -> FixtureValues of this thread
+        self._locks = {fixture.name: threading.Lock() for fixture in fixtures}
+        self._async_locks = {}   # fixture name -> asyncio.Lock, created on the run's loop
+
+    def _cache(self, fixture):
+        if fixture.scope == "run":
+            return self._run_cache
+        if fixture.scope == "worker":
+            cache = getattr(self._local, "cache", None)
+            if cache is None:
+                cache = self._local.cache = {}
+            return cache
+        return None
+
+    @staticmethod
+    def _cached(cache, fixture):
+        if fixture.static_entry is not None:
+            return fixture.static_entry
+        entry = cache.get(fixture.name) if cache is not None else None
+        if entry is not None and entry.fresh(time.monotonic()):
+            return entry
+        return None
+
+    def _store(self, cache, fixture, safe_response, verbose):
+        entry, reason = fixture.resolved(safe_response, time.monotonic())
+        if entry is None:
+            print(f"❌ Fixture {fixture.name} failed: {reason}")
+            return None
+        if cache is not None:
+            cache[fixture.name] = entry
+        if verbose:
+            expiry = f", refreshed in {entry.expires_at - time.monotonic():.0f}s" if entry.expires_at else ""
+            print(f"🔑 Fixture {fixture.name} ({fixture.scope} scope): {len(entry.values)} value(s){expiry}")
+        return entry
+
+    def values(self, send, verbose=False):
+        values = {}
+        for fixture in self.fixtures:
+            cache = self._cache(fixture)
+            entry = self._cached(cache, fixture)
+            if entry is None:
+                # Threads needing a run fixture wait for the one resolving it
+                with self._locks[fixture.name] if fixture.scope == "run" else _NO_LOCK:
+                    entry = self._cached(cache, fixture)
+                    if entry is None:
+                        safe_response = send(fixture.name, fixture.request_data(values))
+                        entry = self._store(cache, fixture, safe_response, verbose)
+                        if entry is None:
+                            return {}, fixture.name
+            values.update(entry.values)
+        return values, None
+
+    async def values_async(self, send, verbose=False):
+        values = {}
+        for fixture in self.fixtures:
+            cache = self._cache(fixture)
+            entry = self._cached(cache, fixture)
+            if entry is None:
+                lock = self._async_locks.get(fixture.name)
+                if lock is None:
+                    lock = self._async_locks[fixture.name] = asyncio.Lock()
+                # Iterations needing a run or worker fixture wait for the one resolving it
+                async with lock if cache is not None else _NO_LOCK:
+                    entry = self._cached(cache, fixture)
+                    if entry is None:
+                        safe_response = await send(fixture.name, fixture.request_data(values))
+                        entry = self._store(cache, fixture, safe_response, verbose)
+                        if entry is None:
+                            return {}, fixture.name
+            values.update(entry.values)
+        return values, None
+
+    def invalidate(self, status_code, used_values):
+        """
+        Drops the cached values of the fixtures refreshed on status_code,
+        unless another call refreshed them since `used_values` were taken.
+        """
+        for fixture in self.fixtures:
+            cache = self._cache(fixture)
+            if status_code not in fixture.refresh_on or cache is None:
+                continue
+            entry = cache.get(fixture.name)
+            if entry is not None and all(used_values.get(key) == value for key, value in entry.values.items()):
+                cache.pop(fixture.name, None)
+
+
+def load_fixtures(scenario_name, api_config, fixtures_dir="fixtures"):
+    """
+    Returns the FixtureSet of a scenario, or None when it has no fixtures
+    file.
+    """
+    path = fixtures_path_for(scenario_name, fixtures_dir)
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        definitions = json.load(f)
+
+    fixtures = [Fixture(name, definition, api_config) for name, definition in definitions.items()]
+    return FixtureSet(fixtures) if fixtures else None
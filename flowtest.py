@@ -0,0 +1,305 @@
+"""
+Headless command line runner for FlowTest Studio.
+
+    python flowtest.py run --project projects/my_project.json --scenario Test
+    python flowtest.py load --project projects/my_project.json --scenario Test --vus 20 --duration 60
+    python flowtest.py stub --port 8000 --write-config configs/api_config_stub.json
+
+Runs a scenario without PyQt5, so it works on display-less CI machines and
+several scenarios can be run side by side from separate processes.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+from load_runner import LoadProfile
+from main_backend import startEngine
+from progress import SummaryListener
+from transport import Transport
+
+
+def load_project_scenarios(project_path):
+    """
+    Returns the scenario → API sequence mapping stored in a project file.
+    """
+    if not os.path.exists(project_path):
+        raise FileNotFoundError(f"Project file not found at: {project_path}")
+
+    with open(project_path, "r", encoding="utf-8") as f:
+        project = json.load(f)
+
+    return project.get("scenarios", {})
+
+
+def with_cassette(transport, args, engine="sync"):
+    """
+    Wraps the run's transport for --record, or replaces it for --replay
+    (see cassette.py).
+    """
+    if not (args.record or args.replay):
+        return transport
+
+    import cassette
+
+    if args.replay:
+        transport_class = cassette.AsyncReplayTransport if engine == "async" else cassette.ReplayTransport
+        return transport_class(args.replay)
+
+    transport_class = cassette.AsyncRecordingTransport if engine == "async" else cassette.RecordingTransport
+    return transport_class(transport, args.record)
+
+
+def add_cassette_arguments(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", metavar="CASSETTE", help="Record every request/response of the run to this cassette file, e.g. cassettes/Test.jsonl.gz")
+    group.add_argument("--replay", metavar="CASSETTE", help="Answer requests from this cassette file instead of the network")
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument("--metrics-port", type=int, metavar="PORT", help="Serve live run metrics (OpenMetrics/Prometheus) at http://HOST:PORT/metrics")
+    parser.add_argument("--metrics-host", default="127.0.0.1", help="Address of the metrics endpoint (default: 127.0.0.1)")
+    parser.add_argument("--metrics-textfile", metavar="PATH", help="Keep the metrics in this file for the node_exporter textfile collector, e.g. /var/lib/node_exporter/flowtest.prom")
+    parser.add_argument("--metrics-interval", type=float, default=5.0, help="Seconds between textfile updates (default: 5)")
+
+
+@contextlib.contextmanager
+def exported_metrics(args, labels):
+    """
+    Yields the run's metrics.RunMetrics, served and/or written to a textfile
+    for --metrics-port / --metrics-textfile, or None without them.
+    """
+    if args.metrics_port is None and not args.metrics_textfile:
+        yield None
+        return
+
+    from metrics import MetricsServer, RunMetrics, TextfileExporter
+
+    metrics = RunMetrics(labels)
+    exporters = []
+    if args.metrics_port is not None:
+        exporters.append(MetricsServer(metrics, args.metrics_host, args.metrics_port).start())
+    if args.metrics_textfile:
+        exporters.append(TextfileExporter(metrics, args.metrics_textfile, args.metrics_interval).start())
+    try:
+        yield metrics
+    finally:
+        for exporter in exporters:
+            exporter.stop()
+
+
+def run_command(args):
+    scenarios = load_project_scenarios(args.project)
+    if args.scenario not in scenarios:
+        print(f"Scenario '{args.scenario}' not found in {args.project}", file=sys.stderr)
+        return 2
+
+    if args.parallel_iterations < 1:
+        print("--parallel-iterations must be at least 1", file=sys.stderr)
+        return 2
+
+    if args.dag and args.engine == "async":
+        print("--dag is only supported by the sync engine", file=sys.stderr)
+        return 2
+
+    # --respect-order without names keeps declared order for every API
+    respect_order = args.respect_order
+    if respect_order is not None and not respect_order:
+        respect_order = True
+
+    transport_options = dict(
+        # Every worker needs its own keep-alive connection
+        pool_maxsize=max(args.pool_size, args.parallel_iterations * (len(scenarios[args.scenario]) if args.dag else 1)),
+        keep_alive=not args.no_keep_alive,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+    )
+    if args.engine == "async":
+        # One aiohttp session per host, never evicted: no host pool count
+        from transport import AsyncTransport
+        transport = AsyncTransport(**transport_options)
+    else:
+        transport = Transport(pool_connections=args.pool_connections, **transport_options)
+
+    transport = with_cassette(transport, args, args.engine)
+
+    profiler = None
+    if args.profile or args.profile_cpu or args.profile_memory or args.trace:
+        from profiler import RunProfiler, trace_path_for
+        trace_path = trace_path_for(args.scenario) if args.trace else None
+        profiler = RunProfiler(cpu=args.profile_cpu, memory=args.profile_memory, trace_path=trace_path)
+
+    listener = SummaryListener()
+    with exported_metrics(args, {"scenario": args.scenario, "mode": "run"}) as metrics:
+        startEngine.runBackend(args.scenario, listener, args.project, transport, args.parallel_iterations,
+                               args.engine, args.dag, respect_order, args.report_details, not args.no_fail_fast,
+                               profiler, metrics)
+
+    # Non-zero exit code when any testcase failed, so CI jobs fail the build
+    return 1 if listener.failed else 0
+
+
+def parse_stage(value):
+    """
+    argparse type of --stage: "SECONDS:TARGET" -> (seconds, target).
+    """
+    try:
+        duration, target = value.split(":")
+        return float(duration), float(target)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid stage '{value}', expected SECONDS:TARGET")
+
+
+def load_command(args):
+    scenarios = load_project_scenarios(args.project)
+    if args.scenario not in scenarios:
+        print(f"Scenario '{args.scenario}' not found in {args.project}", file=sys.stderr)
+        return 2
+
+    if args.vus < 1:
+        print("--vus must be at least 1", file=sys.stderr)
+        return 2
+
+    if args.duration is None and not args.stage:
+        print("--duration or --stage is required", file=sys.stderr)
+        return 2
+
+    if args.rate is not None and args.rate <= 0:
+        print("--rate must be positive", file=sys.stderr)
+        return 2
+
+    # --respect-order without names keeps declared order for every API
+    respect_order = args.respect_order
+    if respect_order is not None and not respect_order:
+        respect_order = True
+
+    profile = LoadProfile.from_options(args.vus, args.duration or 0, args.ramp_up, args.ramp_down, args.rate,
+                                       args.stage)
+
+    transport = Transport(
+        pool_connections=args.pool_connections,
+        # Every virtual user needs its own keep-alive connection
+        pool_maxsize=args.vus * (len(scenarios[args.scenario]) if args.dag else 1),
+        keep_alive=not args.no_keep_alive,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+    )
+
+    transport = with_cassette(transport, args)
+
+    with exported_metrics(args, {"scenario": args.scenario, "mode": "load"}) as metrics:
+        summary = startEngine.runLoad(args.scenario, args.project, profile, transport, args.dag, respect_order,
+                                      not args.no_fail_fast, metrics)
+
+    # Non-zero exit code when any request failed
+    return 1 if any(stats["failed"] for stats in summary["apis"].values()) else 0
+
+
+def stub_command(args):
+    # Imported here: only the stub command needs the server
+    from stub_server import StubServer, stub_config
+
+    if not os.path.exists(args.config):
+        print(f"API config not found at: {args.config}", file=sys.stderr)
+        return 2
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        api_config = json.load(f)
+
+    try:
+        server = StubServer(api_config, args.host, args.port, args.latency, args.error_rate, args.error_status,
+                            args.ids, args.echo, args.seed)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    if args.write_config:
+        with open(args.write_config, "w", encoding="utf-8") as f:
+            json.dump(stub_config(api_config, server.url), f, indent=4)
+        print(f"📝 Config pointing at the stub written to {args.write_config}")
+
+    for method, _, path in server.routes:
+        print(f"  {method} {path}")
+    print(f"🧪 Stub server listening on {server.url} (Ctrl+C to stop)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="flowtest", description="FlowTest Studio headless runner")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    run_parser = subparsers.add_parser("run", help="Run a scenario of a project")
+    run_parser.add_argument("--project", required=True, help="Path to the project file, e.g. projects/my_project.json")
+    run_parser.add_argument("--scenario", required=True, help="Name of the scenario to run")
+    run_parser.add_argument("--engine", choices=("sync", "async"), default="sync", help="Execution engine: thread based 'sync' or asyncio based 'async' (default: sync)")
+    run_parser.add_argument("--parallel-iterations", type=int, default=1, metavar="N", help="Run N testcase iterations concurrently; with --engine async, iterations in flight (default: 1)")
+    run_parser.add_argument("--dag", action="store_true", help="Send independent APIs of an iteration concurrently, following the interaction levels")
+    run_parser.add_argument("--respect-order", nargs="*", metavar="API", help="With --dag, keep declared order for the given APIs (all APIs when no name is given)")
+    run_parser.add_argument("--no-fail-fast", action="store_true", help="Send calls even when an API they take values from failed in the iteration")
+    run_parser.add_argument("--report-details", action="store_true", help="Add a sheet with one row per testcase result to the report")
+    run_parser.add_argument("--profile", action="store_true", help="Time the phases of every call and write results/<scenario>_profile.json")
+    run_parser.add_argument("--profile-cpu", action="store_true", help="With --profile, also capture a cProfile of the run (results/<scenario>_profile.prof)")
+    run_parser.add_argument("--profile-memory", action="store_true", help="With --profile, also trace allocations with tracemalloc")
+    run_parser.add_argument("--trace", action="store_true", help="Write a Chrome/Perfetto trace-event timeline of the run to results/<scenario>_trace.json (implies --profile)")
+    run_parser.add_argument("--pool-connections", type=int, default=10, help="Number of host pools to keep, sync engine (default: 10)")
+    run_parser.add_argument("--pool-size", type=int, default=10, help="Keep-alive connections per host (default: 10)")
+    run_parser.add_argument("--no-keep-alive", action="store_true", help="Close the connection after every request")
+    run_parser.add_argument("--connect-timeout", type=float, default=10.0, help="Connect timeout in seconds (default: 10)")
+    run_parser.add_argument("--read-timeout", type=float, default=30.0, help="Read timeout in seconds (default: 30)")
+    add_cassette_arguments(run_parser)
+    add_metrics_arguments(run_parser)
+    run_parser.set_defaults(func=run_command)
+
+    load_parser = subparsers.add_parser("load", help="Run a scenario as a load test")
+    load_parser.add_argument("--project", required=True, help="Path to the project file, e.g. projects/my_project.json")
+    load_parser.add_argument("--scenario", required=True, help="Name of the scenario to loop")
+    load_parser.add_argument("--vus", type=int, default=10, help="Number of virtual users (default: 10)")
+    load_parser.add_argument("--duration", type=float, help="Total duration in seconds")
+    load_parser.add_argument("--ramp-up", type=float, default=0, help="Seconds to ramp up to the target (default: 0)")
+    load_parser.add_argument("--ramp-down", type=float, default=0, help="Seconds to ramp down at the end (default: 0)")
+    load_parser.add_argument("--stage", type=parse_stage, action="append", metavar="SECONDS:TARGET", help="Explicit stage, repeatable; the target ramps linearly from the previous stage")
+    load_parser.add_argument("--rate", type=float, help="Open model: start this many iterations per second (at most --vus in flight)")
+    load_parser.add_argument("--dag", action="store_true", help="Send independent APIs of an iteration concurrently, following the interaction levels")
+    load_parser.add_argument("--respect-order", nargs="*", metavar="API", help="With --dag, keep declared order for the given APIs (all APIs when no name is given)")
+    load_parser.add_argument("--no-fail-fast", action="store_true", help="Send calls even when an API they take values from failed in the iteration")
+    load_parser.add_argument("--pool-connections", type=int, default=10, help="Number of host pools to keep (default: 10)")
+    load_parser.add_argument("--no-keep-alive", action="store_true", help="Close the connection after every request")
+    load_parser.add_argument("--connect-timeout", type=float, default=10.0, help="Connect timeout in seconds (default: 10)")
+    load_parser.add_argument("--read-timeout", type=float, default=30.0, help="Read timeout in seconds (default: 30)")
+    add_cassette_arguments(load_parser)
+    add_metrics_arguments(load_parser)
+    load_parser.set_defaults(func=load_command)
+
+    stub_parser = subparsers.add_parser("stub", help="Serve a local stub of the APIs of an API config")
+    stub_parser.add_argument("--config", default="configs/api_config_new.json", help="API config to stub (default: configs/api_config_new.json)")
+    stub_parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    stub_parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    stub_parser.add_argument("--latency", help="Latency distribution in ms: fixed:20, uniform:10:50, normal:20:5, lognormal:20:0.5 or exponential:20")
+    stub_parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with --error-status (default: 0)")
+    stub_parser.add_argument("--error-status", type=int, default=500, help="Status code of injected errors (default: 500)")
+    stub_parser.add_argument("--ids", choices=("uuid", "int"), default="uuid", help="Ids of inserted rows (default: uuid)")
+    stub_parser.add_argument("--echo", action="store_true", help="Answer every request with its params and body instead of PostgREST-like tables")
+    stub_parser.add_argument("--seed", type=int, help="Random seed for latency, errors and ids")
+    stub_parser.add_argument("--write-config", metavar="PATH", help="Write a copy of the config pointing at the stub")
+    stub_parser.set_defaults(func=stub_command)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
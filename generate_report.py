@@ -1,9 +1,136 @@
 import os
 import json
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.chart import BarChart, LineChart, Reference
 from openpyxl.utils import get_column_letter
 from datetime import datetime
+from report_writer import CENTER, LEFT, SheetWriter, new_report_workbook
+from results_store import iter_results, results_path_for
+from sketch import LatencyAggregator, latency_path_for
+
+
+def _iter_scenario_results(results_path, scenario_name):
+    """
+    Yields (api_name, index, result) from the run's JSONL store, streamed,
+    or from a legacy results.json.
+    """
+    if results_path.endswith(".jsonl"):
+        yield from iter_results(results_path)
+        return
+
+    with open(results_path, "r", encoding="utf-8") as f:
+        results = json.load(f)
+
+    scenario_data = results.get(scenario_name)
+    if scenario_data is None:
+        raise ValueError(f"Scenario '{scenario_name}' not found in results.json")
+
+    for api_name, testcases in scenario_data.items():
+        for idx_str, res in testcases.items():
+            yield api_name, idx_str, res
+
+
+def _status_code(res):
+    # Normalize status_code to int if possible
+    status = res.get("status_code")
+    if isinstance(status, int):
+        return status
+    if isinstance(status, str):
+        try:
+            return int(status)
+        except ValueError:
+            return None
+    return None
+
+
+def _is_passed(res, code_int):
+    # Decide pass/fail: 2xx + no error -> passed, else failed
+    error = res.get("error")
+    return code_int is not None and 200 <= code_int < 300 and (error is None or error == "")
+
+
+class ReportAggregates:
+    """
+    Everything the test report summarizes, updated as each result arrives:
+    testcases per API, pass/fail totals, error-code counts, the failed
+    endpoint index with its testcase numbers, the calls skipped because an
+    upstream API failed (counted apart from failures) and the response time sketches
+    (sketch.LatencyAggregator). The engines keep one per run, so writing the
+    report does not re-read the results.
+    """
+
+    def __init__(self, api_config):
+        self.api_config = api_config
+        self.tests_per_api = {}   # api_name -> results
+        self.total_passed = 0
+        self.total_failed = 0
+        self.error_code_counts = {}   # status_code -> count (for failed only)
+        self.failed_endpoints = {}   # (endpoint, code) -> list of testcase indices
+        self.total_skipped = 0
+        self.skipped = {}   # (api_name, failed upstream api) -> list of testcase indices
+        self.latency = LatencyAggregator()
+        self._endpoints = {}   # api_name -> endpoint
+
+    def _endpoint(self, api_name):
+        endpoint = self._endpoints.get(api_name)
+        if endpoint is None:
+            # Build endpoint from api_config
+            cfg = self.api_config.get(api_name, {})
+            base_url = cfg.get("url", "")
+            path = cfg.get("path", "")
+            endpoint = f"{base_url}{path}" if (base_url or path) else api_name
+            self._endpoints[api_name] = endpoint
+        return endpoint
+
+    def record(self, api_name, index, res, latency=True):
+        """
+        Counts one result; `index` is the 1-based testcase number.
+        latency=False leaves the response time sketches out (when they are
+        loaded from a file instead).
+        """
+        self.tests_per_api[api_name] = self.tests_per_api.get(api_name, 0) + 1
+
+        if res.get("skipped_by"):
+            self.total_skipped += 1
+            self.skipped.setdefault((api_name, res["skipped_by"]), []).append(str(index))
+            return
+
+        if latency:
+            self.latency.record(api_name, res)
+
+        code_int = _status_code(res)
+
+        if _is_passed(res, code_int):
+            self.total_passed += 1
+        else:
+            self.total_failed += 1
+
+            if code_int is not None:
+                self.error_code_counts[code_int] = self.error_code_counts.get(code_int, 0) + 1
+
+                key = (self._endpoint(api_name), code_int)
+                self.failed_endpoints.setdefault(key, []).append(str(index))
+
+    def skipped_count(self, api_name):
+        """
+        Calls of api_name not sent because an upstream API failed.
+        """
+        return sum(len(indices) for (skipped_api, _), indices in self.skipped.items() if skipped_api == api_name)
+
+    @classmethod
+    def from_results(cls, results_path, scenario_name, api_config, latency_path=None):
+        """
+        Rebuilds the aggregates of a finished run by streaming its results.
+        Response times come from the run's latency sketches when
+        `latency_path` exists, otherwise from the results' timing entries.
+        """
+        aggregates = cls(api_config)
+        load_latency = latency_path is not None and os.path.exists(latency_path)
+        if load_latency:
+            aggregates.latency = LatencyAggregator.load(latency_path)
+
+        for api_name, idx_str, res in _iter_scenario_results(results_path, scenario_name):
+            aggregates.record(api_name, idx_str, res, latency=not load_latency)
+        return aggregates
 
 
 def generate_test_report_xlsx(
@@ -12,221 +139,393 @@ def generate_test_report_xlsx(
     results_path: str = None,
     api_config_path: str = "configs/api_config_new.json",
     output_path: str = None,
+    latency_path: str = None,
+    details: bool = False,
+    aggregates: ReportAggregates = None,
 ):
     """
-    Generate a styled Excel report for a given project + scenario
-    using results.json and api_config_new.json.
+    Generate a styled Excel report for a given project + scenario.
+
+    `aggregates` are the ReportAggregates the engine kept during the run;
+    the report then only serializes them. Without them they are rebuilt
+    from the scenario's results and api_config_new.json: results_path
+    defaults to the run's JSONL store (results/<scenario>_results.jsonl), a
+    legacy results.json is accepted too, and response time percentiles come
+    from the run's latency sketches (results/<scenario>_latency.json) when
+    present.
+
+    The workbook is written in openpyxl's write-only mode, so memory does
+    not grow with the number of results. details=True adds a "Testcase
+    Details" sheet with one row per result, streamed from the results.
     """
 
     # ----- Resolve default paths -----
     if results_path is None:
-        # default: results/<project_name>/results.json
-        results_path = os.path.join("results", "results.json")
+        results_path = results_path_for(scenario_name)
 
     if output_path is None:
         os.makedirs("reports", exist_ok=True)
-        
+
         timestamp = datetime.now().strftime("%d%m%y%S")  # DDMMYYSS format
-        
+
         output_filename = f"{timestamp}_{project_name}_{scenario_name}_report.xlsx"
         output_filename = output_filename.replace(" ", "_")  # remove spaces
-        
+
         output_path = os.path.join("reports", output_filename)
 
     # ----- Load JSON data -----
-    if not os.path.exists(results_path):
-        raise FileNotFoundError(f"results.json not found at: {results_path}")
+    if aggregates is None or details:
+        if not os.path.exists(results_path):
+            raise FileNotFoundError(f"Results not found at: {results_path}")
 
-    with open(results_path, "r", encoding="utf-8") as f:
-        results = json.load(f)
+    if aggregates is None:
+        if not os.path.exists(api_config_path):
+            raise FileNotFoundError(f"api_config_new.json not found at: {api_config_path}")
 
-    scenario_data = results.get(scenario_name)
-    if scenario_data is None:
-        raise ValueError(f"Scenario '{scenario_name}' not found in results.json")
+        with open(api_config_path, "r", encoding="utf-8") as f:
+            api_config = json.load(f)
 
-    if not os.path.exists(api_config_path):
-        raise FileNotFoundError(f"api_config_new.json not found at: {api_config_path}")
+        if latency_path is None:
+            latency_path = latency_path_for(scenario_name)
 
-    with open(api_config_path, "r", encoding="utf-8") as f:
-        api_config = json.load(f)
+        aggregates = ReportAggregates.from_results(results_path, scenario_name, api_config, latency_path)
 
     # ----- Compute metrics -----
-    total_apis = len(scenario_data)
-
-    # testcases per API (count entries per API)
-    tests_per_api = {api_name: len(tc_dict) for api_name, tc_dict in scenario_data.items()}
-    max_testcases_per_api = max(tests_per_api.values()) if tests_per_api else 0
-
-    total_passed = 0
-    total_failed = 0
-
-    # Error code → count (for failed only)
-    error_code_counts = {}  # status_code -> count
-
-    # (endpoint, error_code) -> [test_indices]
-    failed_endpoints = {}   # (endpoint, code) -> list of testcase indices
-
-    for api_name, testcases in scenario_data.items():
-        for idx_str, res in testcases.items():
-            try:
-                test_index = int(idx_str)
-            except ValueError:
-                # in case keys aren't numeric strings
-                test_index = idx_str
-
-            status = res.get("status_code")
-            error = res.get("error")
-
-            # Normalize status_code to int if possible
-            code_int = None
-            if isinstance(status, int):
-                code_int = status
-            elif isinstance(status, str):
-                try:
-                    code_int = int(status)
-                except ValueError:
-                    code_int = None
-
-            # Decide pass/fail: 2xx + no error -> passed, else failed
-            if code_int is not None and 200 <= code_int < 300 and (error is None or error == ""):
-                total_passed += 1
-            else:
-                total_failed += 1
-
-                if code_int is not None:
-                    error_code_counts[code_int] = error_code_counts.get(code_int, 0) + 1
-
-                    # Build endpoint from api_config
-                    cfg = api_config.get(api_name, {})
-                    base_url = cfg.get("url", "")
-                    path = cfg.get("path", "")
-                    endpoint = f"{base_url}{path}" if (base_url or path) else api_name
-
-                    key = (endpoint, code_int)
-                    failed_endpoints.setdefault(key, []).append(str(test_index))
+    total_apis = len(aggregates.tests_per_api)
+    max_testcases_per_api = max(aggregates.tests_per_api.values()) if aggregates.tests_per_api else 0
+    total_passed = aggregates.total_passed
+    total_failed = aggregates.total_failed
+    error_code_counts = aggregates.error_code_counts
+    failed_endpoints = aggregates.failed_endpoints
+    latency = aggregates.latency
 
     # ----- Create Excel workbook -----
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Test Report"
-
-    # Styles
-    bold_font = Font(bold=True)
-    header_fill = PatternFill("solid", fgColor="4F81BD")  # blue header
-    header_font = Font(bold=True, color="FFFFFF")
-    section_fill = PatternFill("solid", fgColor="D9D9D9")  # light grey for section titles
-    center = Alignment(horizontal="center", vertical="center")
-    left = Alignment(horizontal="left", vertical="center")
-
-    row = 1
+    wb = new_report_workbook()
+    sheet = SheetWriter(wb, "Test Report")
 
     # ----- Header: Project & Scenario -----
-    ws[f"A{row}"] = "Project name:"
-    ws[f"A{row}"].font = bold_font
-    ws[f"B{row}"] = project_name
-    row += 1
-
-    ws[f"A{row}"] = "Scenario name:"
-    ws[f"A{row}"].font = bold_font
-    ws[f"B{row}"] = scenario_name
-    row += 2  # blank line after header
+    sheet.label("Project name:", project_name)
+    sheet.label("Scenario name:", scenario_name)
+    sheet.blank()  # blank line after header
 
     # ----- Summary numbers -----
-    ws[f"A{row}"] = "Total no. of APIs:"
-    ws[f"A{row}"].font = bold_font
-    ws[f"B{row}"] = total_apis
-    row += 1
-
-    ws[f"A{row}"] = "Total no. of testcases per API:"
-    ws[f"A{row}"].font = bold_font
-    ws[f"B{row}"] = max_testcases_per_api
-    row += 1
-
-    ws[f"A{row}"] = "Total no. of testcases passed:"
-    ws[f"A{row}"].font = bold_font
-    ws[f"B{row}"] = total_passed
-    row += 1
-
-    ws[f"A{row}"] = "Total no. of testcases failed:"
-    ws[f"A{row}"].font = bold_font
-    ws[f"B{row}"] = total_failed
-    row += 2
+    sheet.label("Total no. of APIs:", total_apis)
+    sheet.label("Total no. of testcases per API:", max_testcases_per_api)
+    sheet.label("Total no. of testcases passed:", total_passed)
+    sheet.label("Total no. of testcases failed:", total_failed)
+    sheet.label("Total no. of testcases skipped (upstream failed):", aggregates.total_skipped)
+    sheet.blank()
 
     # ----- Error Code Summary Table -----
-    ws[f"A{row}"] = "Error Code Summary"
-    ws[f"A{row}"].font = bold_font
-    ws[f"A{row}"].fill = section_fill
-    row += 1
-
-    # Table headers
-    ws[f"A{row}"] = "Error code"
-    ws[f"B{row}"] = "Count"
-    for col in ("A", "B"):
-        ws[f"{col}{row}"].font = header_font
-        ws[f"{col}{row}"].fill = header_fill
-        ws[f"{col}{row}"].alignment = center
-    row += 1
+    sheet.section("Error Code Summary")
+    sheet.header(["Error code", "Count"])
 
     # Table rows
     if error_code_counts:
         for code, count in sorted(error_code_counts.items()):
-            ws[f"A{row}"] = code
-            ws[f"A{row}"].alignment = center
-            ws[f"B{row}"] = count
-            ws[f"B{row}"].alignment = center
-            row += 1
+            sheet.row(code, count, style=CENTER)
     else:
-        ws[f"A{row}"] = "No failed testcases."
-        row += 1
+        sheet.row("No failed testcases.")
 
-    row += 1  # blank line
+    sheet.blank()
 
     # ----- Failed API endpoints Table -----
-    ws[f"A{row}"] = "Failed API Endpoints"
-    ws[f"A{row}"].font = bold_font
-    ws[f"A{row}"].fill = section_fill
-    row += 1
-
-    # Table headers
-    ws[f"A{row}"] = "Failed API endpoint"
-    ws[f"B{row}"] = "Error code"
-    ws[f"C{row}"] = "Test case indices"
-    for col in ("A", "B", "C"):
-        ws[f"{col}{row}"].font = header_font
-        ws[f"{col}{row}"].fill = header_fill
-        ws[f"{col}{row}"].alignment = center
-    row += 1
+    sheet.section("Failed API Endpoints")
+    sheet.header(["Failed API endpoint", "Error code", "Test case indices"])
 
     if failed_endpoints:
         for (endpoint, code), indices in sorted(failed_endpoints.items(), key=lambda x: (x[0][0], x[0][1])):
-            ws[f"A{row}"] = endpoint
-            ws[f"A{row}"].alignment = left
+            # semicolon-separated indices
+            sheet.row(
+                (endpoint, LEFT),
+                (code, CENTER),
+                ("; ".join(sorted(indices, key=lambda x: int(x) if x.isdigit() else x)), LEFT),
+            )
+    else:
+        sheet.row("No failed API endpoints.")
+
+    sheet.blank()
+
+    # ----- Skipped Testcases Table -----
+    sheet.section("Skipped Testcases (Upstream Failed)")
+    sheet.header(["API", "Failed upstream API", "Count", "Test case indices"])
+
+    if aggregates.skipped:
+        for (api_name, upstream_api), indices in aggregates.skipped.items():
+            sheet.row(
+                (api_name, LEFT),
+                (upstream_api, LEFT),
+                (len(indices), CENTER),
+                ("; ".join(sorted(indices, key=lambda x: int(x) if x.isdigit() else x)), LEFT),
+            )
+    else:
+        sheet.row("No skipped testcases.")
+
+    sheet.blank()
+
+    # ----- Response Time Summary Table -----
+    sheet.section("Response Time Summary")
+    sheet.header(["API", "Requests", "Avg (ms)", "Min (ms)", "p50 (ms)", "p90 (ms)", "p99 (ms)", "Max (ms)",
+                  "Avg TTFB (ms)", "Reused connections", "Bytes transferred"])
+
+    timing_by_api = latency.by_api()
+    if timing_by_api:
+        for api_name, stats in timing_by_api.items():
+            total = stats["total"]
+            sheet.table_row([
+                api_name,
+                total.count,
+                round(total.mean, 2),
+                round(total.min, 2),
+                round(total.quantile(0.5), 2),
+                round(total.quantile(0.9), 2),
+                round(total.quantile(0.99), 2),
+                round(total.max, 2),
+                round(stats["ttfb"].mean, 2),
+                stats["reused"],
+                stats["bytes"],
+            ])
+    else:
+        sheet.row("No timing data recorded.")
+
+    sheet.blank()
+
+    # ----- Response Time by Status Code Table -----
+    sheet.section("Response Time by Status Code")
+    sheet.header(["API", "Status code", "Requests", "p50 (ms)", "p90 (ms)", "p99 (ms)", "Max (ms)"])
+
+    if latency.entries:
+        for (api_name, status), stats in latency.entries.items():
+            total = stats["total"]
+            sheet.table_row([
+                api_name,
+                status,
+                total.count,
+                round(total.quantile(0.5), 2),
+                round(total.quantile(0.9), 2),
+                round(total.quantile(0.99), 2),
+                round(total.max, 2),
+            ])
+    else:
+        sheet.row("No timing data recorded.")
 
-            ws[f"B{row}"] = code
-            ws[f"B{row}"].alignment = center
+    sheet.close()
 
-            # semicolon-separated indices
-            ws[f"C{row}"] = "; ".join(sorted(indices, key=lambda x: int(x) if x.isdigit() else x))
-            ws[f"C{row}"].alignment = left
+    # ----- Performance sheet -----
+    write_performance_sheet(SheetWriter(wb, "Performance"), latency)
 
-            row += 1
-    else:
-        ws[f"A{row}"] = "No failed API endpoints."
-        row += 1
-
-    # ----- Auto-adjust column widths -----
-    for col_idx in range(1, 6):  # up to column E for safety
-        col_letter = get_column_letter(col_idx)
-        max_length = 0
-        for cell in ws[col_letter]:
-            if cell.value is not None:
-                cell_length = len(str(cell.value))
-                if cell_length > max_length:
-                    max_length = cell_length
-        # Add some padding
-        if max_length > 0:
-            ws.column_dimensions[col_letter].width = min(max_length + 4, 60)  # cap width at 60
+    # ----- Testcase Details sheet -----
+    if details:
+        write_details_sheet(SheetWriter(wb, "Testcase Details"), _iter_scenario_results(results_path, scenario_name))
 
     # ----- Save workbook -----
     wb.save(output_path)
     print(f"✅ Report generated at: {output_path}")
+
+
+def write_details_sheet(sheet, results):
+    """
+    Streams one row per result (api_name, index, result) into the
+    "Testcase Details" sheet.
+    """
+    sheet.header(["API", "Testcase", "Status code", "Result", "Error", "Total (ms)", "TTFB (ms)",
+                  "Connection reused", "Bytes transferred"])
+
+    for api_name, idx_str, res in results:
+        code_int = _status_code(res)
+        timing = res.get("timing") or {}
+        sheet.table_row([
+            api_name,
+            int(idx_str) if str(idx_str).isdigit() else idx_str,
+            res.get("status_code"),
+            "Skipped" if res.get("skipped_by") else "Passed" if _is_passed(res, code_int) else "Failed",
+            res.get("error"),
+            timing.get("total_ms"),
+            timing.get("ttfb_ms"),
+            timing.get("connection_reused"),
+            timing.get("request_bytes", 0) + timing.get("response_bytes", 0) if timing else None,
+        ])
+
+    sheet.close()
+
+
+def write_performance_sheet(sheet, latency):
+    """
+    Fills the "Performance" sheet from a run's sketch.LatencyAggregator:
+    per-API throughput and latency percentiles, the responses completed in
+    every second (or wider bucket, on long runs) of the run, and charts of
+    both.
+    """
+    duration_s = latency.duration_s
+    timing_by_api = latency.by_api()
+
+    failed_by_api = {}   # api_name -> non-2xx responses
+    for (api_name, status), stats in latency.entries.items():
+        if not status.startswith("2"):
+            failed_by_api[api_name] = failed_by_api.get(api_name, 0) + stats["total"].count
+
+    sheet.label("Run duration (s):", round(duration_s, 3))
+
+    total_requests = sum(stats["total"].count for stats in timing_by_api.values())
+    sheet.label("Overall throughput (req/s):", round(total_requests / duration_s, 2) if duration_s else 0)
+    sheet.blank()
+
+    # ----- Per-API Throughput & Latency Table -----
+    sheet.section("Throughput & Latency per API")
+    perf_headers = ["API", "Requests", "Failed", "Throughput (req/s)", "Min (ms)", "Mean (ms)",
+                    "p50 (ms)", "p95 (ms)", "p99 (ms)", "Max (ms)", "Bytes transferred"]
+    header_row = sheet.header(perf_headers)
+
+    for api_name, stats in timing_by_api.items():
+        total = stats["total"]
+        last_api_row = sheet.table_row([
+            api_name,
+            total.count,
+            failed_by_api.get(api_name, 0),
+            round(total.count / duration_s, 2) if duration_s else 0,
+            round(total.min, 2),
+            round(total.mean, 2),
+            round(total.quantile(0.5), 2),
+            round(total.quantile(0.95), 2),
+            round(total.quantile(0.99), 2),
+            round(total.max, 2),
+            stats["bytes"],
+        ])
+
+    if not timing_by_api:
+        sheet.row("No timing data recorded.")
+        sheet.close()
+        return
+
+    sheet.blank()
+
+    # ----- Throughput per Second Table -----
+    # Long runs are counted in wider buckets (see sketch.LatencyAggregator)
+    bucket = "Second" if latency.bucket_s == 1 else f"{latency.bucket_s} Seconds"
+    sheet.section(f"Throughput per {bucket}")
+    series_header_row = sheet.header(["Second", "Responses", "Non-2xx responses"])
+
+    last_series_row = series_header_row
+    for values in latency.timeline():
+        last_series_row = sheet.row(*values, style=CENTER)
+
+    sheet.close()
+
+    # ----- Charts -----
+    ws = sheet.ws
+    chart_column = get_column_letter(len(perf_headers) + 2)
+
+    latency_chart = BarChart()
+    latency_chart.title = "Latency percentiles per API"
+    latency_chart.y_axis.title = "ms"
+    # p50 / p95 / p99 columns, series named by their header
+    latency_chart.add_data(Reference(ws, min_col=7, max_col=9, min_row=header_row, max_row=last_api_row),
+                           titles_from_data=True)
+    latency_chart.set_categories(Reference(ws, min_col=1, min_row=header_row + 1, max_row=last_api_row))
+    latency_chart.width = 18
+    ws.add_chart(latency_chart, f"{chart_column}1")
+
+    throughput_chart = LineChart()
+    throughput_chart.title = f"Responses per {bucket.lower()}"
+    throughput_chart.x_axis.title = "Second"
+    throughput_chart.y_axis.title = "Responses"
+    throughput_chart.add_data(Reference(ws, min_col=2, max_col=3, min_row=series_header_row, max_row=last_series_row),
+                              titles_from_data=True)
+    throughput_chart.set_categories(Reference(ws, min_col=1, min_row=series_header_row + 1, max_row=last_series_row))
+    throughput_chart.width = 18
+    ws.add_chart(throughput_chart, f"{chart_column}18")
+
+
+def generate_load_report_xlsx(
+    project_name: str,
+    scenario_name: str,
+    summary_path: str = None,
+    output_path: str = None,
+):
+    """
+    Generate a styled Excel report of a load test from its summary
+    (results/<scenario>_load_summary.json, see load_runner.run_load).
+    """
+
+    # ----- Resolve default paths -----
+    if summary_path is None:
+        summary_path = os.path.join("results", f"{scenario_name}_load_summary.json")
+
+    if output_path is None:
+        os.makedirs("reports", exist_ok=True)
+
+        timestamp = datetime.now().strftime("%d%m%y%S")  # DDMMYYSS format
+
+        output_filename = f"{timestamp}_{project_name}_{scenario_name}_load_report.xlsx"
+        output_filename = output_filename.replace(" ", "_")  # remove spaces
+
+        output_path = os.path.join("reports", output_filename)
+
+    if not os.path.exists(summary_path):
+        raise FileNotFoundError(f"Load summary not found at: {summary_path}")
+
+    with open(summary_path, "r", encoding="utf-8") as f:
+        summary = json.load(f)
+
+    profile = summary.get("profile", {})
+
+    # ----- Create Excel workbook -----
+    wb = new_report_workbook()
+    sheet = SheetWriter(wb, "Load Test")
+
+    # ----- Header: Project, Scenario & Profile -----
+    sheet.label("Project name:", project_name)
+    sheet.label("Scenario name:", scenario_name)
+    sheet.label("Started at:", summary.get("started_at"))
+    sheet.label("Load model:", profile.get("model"))
+    sheet.label("Virtual users:", profile.get("virtual_users"))
+    sheet.label("Target arrival rate (/s):", profile.get("arrival_rate"))
+    sheet.label("Stages (duration s → target):", "; ".join(
+        f"{stage['duration_s']}s → {stage['target']}" for stage in profile.get("stages", [])
+    ))
+    sheet.label("Duration (s):", summary.get("elapsed_s"))
+    sheet.label("Iterations:", summary.get("iterations"))
+    sheet.label("Dropped iterations:", summary.get("dropped_iterations"))
+    sheet.label("Errored iterations:", summary.get("errored_iterations", 0))
+    sheet.blank()
+
+    errors = summary.get("errors", {})
+    if errors:
+        sheet.section("Iteration Errors")
+        sheet.header(["Error", "Iterations"])
+        for message, count in errors.items():
+            sheet.table_row([message, count])
+        sheet.blank()
+
+    # ----- Throughput & Latency Table -----
+    sheet.section("Throughput & Latency")
+    sheet.header(["API", "Requests", "Failed", "Skipped (upstream failed)", "Throughput (req/s)", "Min (ms)",
+                  "Mean (ms)", "p50 (ms)", "p90 (ms)", "p95 (ms)", "p99 (ms)", "Max (ms)", "Bytes transferred"])
+
+    apis = summary.get("apis", {})
+    if apis:
+        for api_name, stats in apis.items():
+            latency = stats["latency_ms"]
+            sheet.table_row([
+                api_name,
+                stats["requests"],
+                stats["failed"],
+                stats.get("skipped", 0),
+                stats["throughput_rps"],
+                latency["min"],
+                latency["mean"],
+                latency["p50"],
+                latency["p90"],
+                latency["p95"],
+                latency["p99"],
+                latency["max"],
+                stats["bytes"],
+            ])
+    else:
+        sheet.row("No requests were sent.")
+
+    sheet.close()
+
+    # ----- Save workbook -----
+    wb.save(output_path)
+    print(f"✅ Load report generated at: {output_path}")
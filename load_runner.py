@@ -0,0 +1,302 @@
+"""
+Load-test mode: reuses a scenario's flow (e.g. Create → Get → Update →
+Delete user) as a load profile.
+
+Closed model: up to N virtual users loop the scenario, the number of active
+users follows the ramp stages. Open model (arrival_rate set): iterations
+start at the target rate, which follows the stages, with at most N in
+flight; iterations that find every virtual user busy are dropped.
+
+An iteration that raises is counted as errored and the run goes on; a
+cancelled run (progress.RunCancelled) stops every virtual user and is
+re-raised.
+"""
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from execute import run_iteration
+from progress import RunCancelled
+from sketch import LatencyAggregator, QuantileSketch
+
+# Distinct error messages kept in the summary; later ones count as "other"
+MAX_ERROR_KINDS = 20
+
+
+class LoadProfile:
+    """
+    stages: [(duration_s, target), ...], target ramps linearly from the
+    previous stage's target (starting at 0). The target is a number of
+    virtual users, or iterations per second when arrival_rate is set.
+    duration: optional hard limit in seconds.
+    """
+
+    def __init__(self, virtual_users, stages, arrival_rate=None, duration=None):
+        self.virtual_users = virtual_users
+        self.stages = stages
+        self.arrival_rate = arrival_rate
+        self.duration = duration
+
+    @classmethod
+    def from_options(cls, virtual_users, duration, ramp_up=0, ramp_down=0, arrival_rate=None, stages=None):
+        """
+        Builds the stages from ramp-up / steady / ramp-down times unless
+        explicit stages are given.
+        """
+        if not stages:
+            target = arrival_rate if arrival_rate else virtual_users
+            steady = max(duration - ramp_up - ramp_down, 0)
+            stages = []
+            if ramp_up:
+                stages.append((ramp_up, target))
+            else:
+                # No ramp-up: start at full target
+                stages.append((0, target))
+            stages.append((steady, target))
+            if ramp_down:
+                stages.append((ramp_down, 0))
+        return cls(virtual_users, stages, arrival_rate, duration)
+
+    @property
+    def total_duration(self):
+        total = sum(stage_duration for stage_duration, _ in self.stages)
+        return min(total, self.duration) if self.duration else total
+
+    def target_at(self, elapsed):
+        """
+        Target (virtual users or iterations/s) at `elapsed` seconds.
+        """
+        previous = 0
+        stage_start = 0
+        for stage_duration, target in self.stages:
+            if elapsed < stage_start + stage_duration:
+                progress = (elapsed - stage_start) / stage_duration
+                return previous + (target - previous) * progress
+            stage_start += stage_duration
+            previous = target
+        return previous
+
+    def to_dict(self):
+        return {
+            "model": "open" if self.arrival_rate else "closed",
+            "virtual_users": self.virtual_users,
+            "arrival_rate": self.arrival_rate,
+            "stages": [{"duration_s": d, "target": t} for d, t in self.stages],
+            "duration_s": self.total_duration,
+        }
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+class LoadStats:
+    """
+    Thread-safe per-API request and failure counts of a load run; response
+    times go to a LatencyAggregator, so memory stays bounded however long
+    the run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.apis = {}   # api_name -> {"requests", "failed", "skipped"}
+        self.latency = LatencyAggregator()
+        self.iterations = 0
+        self.dropped_iterations = 0
+        self.errored_iterations = 0
+        self.errors = {}   # "ExceptionType: message" -> iterations that raised it
+
+    def record_iteration(self, iteration_results):
+        with self._lock:
+            self.iterations += 1
+            for api_name, safe_response, success in iteration_results:
+                stats = self.apis.setdefault(api_name, {"requests": 0, "failed": 0, "skipped": 0})
+                if safe_response.get("skipped_by"):
+                    stats["skipped"] += 1
+                    continue
+                stats["requests"] += 1
+                if not success:
+                    stats["failed"] += 1
+        for api_name, safe_response, _ in iteration_results:
+            self.latency.record(api_name, safe_response)
+
+    def record_dropped(self):
+        with self._lock:
+            self.dropped_iterations += 1
+
+    def record_error(self, error):
+        message = f"{type(error).__name__}: {error}"
+        with self._lock:
+            self.errored_iterations += 1
+            if message not in self.errors and len(self.errors) >= MAX_ERROR_KINDS:
+                message = "other"
+            first = message not in self.errors
+            self.errors[message] = self.errors.get(message, 0) + 1
+        if first:
+            print(f"❌ Iteration failed: {message}")
+
+    def summary(self, elapsed):
+        apis = {}
+        timing_by_api = self.latency.by_api()
+        with self._lock:
+            for api_name, stats in self.apis.items():
+                timing = timing_by_api.get(api_name)
+                total = timing["total"] if timing else QuantileSketch()
+                apis[api_name] = {
+                    "requests": stats["requests"],
+                    "failed": stats["failed"],
+                    "skipped": stats["skipped"],
+                    "throughput_rps": round(stats["requests"] / elapsed, 3) if elapsed else 0,
+                    "bytes": timing["bytes"] if timing else 0,
+                    "latency_ms": {
+                        "min": _round(total.min),
+                        "mean": _round(total.mean),
+                        "p50": _round(total.quantile(0.5)),
+                        "p90": _round(total.quantile(0.9)),
+                        "p95": _round(total.quantile(0.95)),
+                        "p99": _round(total.quantile(0.99)),
+                        "max": _round(total.max),
+                    },
+                }
+            return {
+                "elapsed_s": round(elapsed, 3),
+                "iterations": self.iterations,
+                "dropped_iterations": self.dropped_iterations,
+                "errored_iterations": self.errored_iterations,
+                "errors": dict(self.errors),
+                "apis": apis,
+            }
+
+
+def _run_iteration(ctx, stats, test_index):
+    """
+    Runs and records one iteration; errors other than a cancelled run are
+    counted instead of ending the virtual user.
+    """
+    try:
+        iteration_results = run_iteration(ctx, test_index)
+    except RunCancelled:
+        raise
+    except Exception as e:
+        stats.record_error(e)
+        return
+    stats.record_iteration(iteration_results)
+
+
+def _run_closed(ctx, profile, stats, start, end, counter):
+    cancelled = []
+
+    def virtual_user(vu_id):
+        while not cancelled:
+            now = time.monotonic()
+            if now >= end:
+                return
+            # Users above the current stage target wait for the ramp
+            if vu_id >= round(profile.target_at(now - start)):
+                time.sleep(0.05)
+                continue
+            try:
+                _run_iteration(ctx, stats, next(counter) % ctx.max_test_count)
+            except RunCancelled as e:
+                cancelled.append(e)
+
+    threads = [threading.Thread(target=virtual_user, args=(vu_id,), daemon=True)
+               for vu_id in range(profile.virtual_users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if cancelled:
+        raise cancelled[0]
+
+
+def _run_open(ctx, profile, stats, start, end, counter):
+    free_users = threading.BoundedSemaphore(profile.virtual_users)
+
+    def iteration(test_index):
+        try:
+            _run_iteration(ctx, stats, test_index)
+        finally:
+            free_users.release()
+
+    def check(futures):
+        # Re-raises the error of a finished iteration (a cancelled run)
+        for future in [future for future in futures if future.done()]:
+            futures.discard(future)
+            if future.exception() is not None:
+                raise future.exception()
+
+    futures = set()
+    with ThreadPoolExecutor(max_workers=profile.virtual_users) as executor:
+        # Arrivals due so far: the integral of the target rate over time,
+        # so the schedule follows ramps without waiting out long intervals
+        due = 0.0
+        previous = start
+        while True:
+            check(futures)
+            now = time.monotonic()
+            if now >= end:
+                break
+            rate = profile.target_at(now - start)
+            due += rate * (now - previous)
+            previous = now
+
+            while due >= 1:
+                due -= 1
+                # Open model: arrivals do not wait for busy users
+                if free_users.acquire(blocking=False):
+                    futures.add(executor.submit(iteration, next(counter) % ctx.max_test_count))
+                else:
+                    stats.record_dropped()
+
+            time.sleep(min((1 - due) / rate if rate > 0 else 0.05, 0.05, end - now))
+    check(futures)
+
+
+def run_load(ctx, profile):
+    """
+    Runs the scenario of `ctx` (an execute.RunContext, normally with
+    verbose=False) under the load profile and returns the summary dict.
+    """
+    if ctx.max_test_count == 0:
+        raise ValueError("The scenario has no testcases to loop over")
+
+    stats = LoadStats()
+    counter = itertools.count()
+    started_at = datetime.now().isoformat(timespec="seconds")
+    start = time.monotonic()
+    end = start + profile.total_duration
+
+    print(f"🚀 Load test: {profile.to_dict()['model']} model, {profile.virtual_users} virtual users, {profile.total_duration}s")
+
+    if profile.arrival_rate:
+        _run_open(ctx, profile, stats, start, end, counter)
+    else:
+        _run_closed(ctx, profile, stats, start, end, counter)
+
+    elapsed = time.monotonic() - start
+    summary = stats.summary(elapsed)
+    summary["started_at"] = started_at
+    summary["profile"] = profile.to_dict()
+    return summary
+
+
+def print_load_summary(summary):
+    print(f"\n=== Load test: {summary['iterations']} iterations in {summary['elapsed_s']}s "
+          f"({summary['dropped_iterations']} dropped, {summary['errored_iterations']} errored) ===")
+    for message, count in summary["errors"].items():
+        print(f"❌ {count} iteration(s): {message}")
+    for api_name, stats in summary["apis"].items():
+        latency = stats["latency_ms"]
+        print(f"✔ {api_name}: {stats['requests']} requests, {stats['failed']} failed, {stats['skipped']} skipped, "
+              f"{stats['throughput_rps']} req/s, p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms")
+
+
+def load_summary_path_for(scenario_name, results_dir="results"):
+    """
+    Path of the load-test summary of a scenario: results/<scenario>_load_summary.json
+    """
+    return os.path.join(results_dir, f"{scenario_name}_load_summary.json")
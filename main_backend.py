@@ -1,10 +1,28 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from execute import execute_api_sequence
+from execute import RunContext
+from fixtures import load_fixtures
+from generate_report import generate_load_report_xlsx
+from load_runner import load_summary_path_for
+from load_runner import print_load_summary
+from load_runner import run_load
+from scheduler import build_dependency_graph
+from utils import load_test_case_data
+from transport import Transport
+from plan import get_execution_plan
+from profiler import Profiler
+from profiler import profile_path_for
 import os
 
 class startEngine:
     @staticmethod
-    def runBackend(scenario_name, api_blocks, project_path):
+    def loadScenario(scenario_name):
+        """
+        Loads the API config and the scenario's interactions and compiles its
+        execution plan. Returns (api_config, env_config, api_interactions,
+        plan, interactions_file_path).
+        """
         # Load configurations
         with open("configs/api_config_new.json") as f:
             api_config = json.load(f)
@@ -14,15 +32,125 @@ class startEngine:
         env_config = None
         
         file_path = os.path.join("interactions",scenario_name + "_interactions.json")
-        with open(file_path) as f:
-            api_interactions = json.load(f)
+        with open(file_path, "rb") as f:
+            interactions_source = f.read()
+        api_interactions = json.loads(interactions_source)
 
-        for block in api_blocks:
-            block.reset_status()
+        # Compiled once and cached by the interactions file hash
+        plan = get_execution_plan(interactions_source, api_interactions, api_config)
 
-        # Execute the API sequence
-        updated_api_interactions = execute_api_sequence(api_config, env_config, api_interactions, scenario_name, api_blocks, project_path)
+        return api_config, env_config, api_interactions, plan, file_path
+
+    @staticmethod
+    def runBackend(scenario_name, listener, project_path, transport=None, parallel_iterations=1, engine="sync", dag=False, respect_order=None, report_details=False, fail_fast=True, profiler=None, metrics=None):
+        """
+        Runs a scenario. `listener` is a progress.ProgressListener
+        (signal based in the GUI, a headless listener from the CLI).
+        `transport` is the pooled HTTP transport of the run; a default one is
+        created when omitted. `parallel_iterations` > 1 runs testcase
+        iterations on a thread pool of that size.
+
+        engine="async" runs the scenario on the asyncio engine instead; then
+        `transport` must be a transport.AsyncTransport and
+        `parallel_iterations` is the number of iterations in flight.
+
+        dag=True (sync engine) sends independent APIs of an iteration
+        concurrently; see execute.execute_api_sequence for respect_order.
+
+        report_details=True adds a per-testcase sheet to the report.
+        fail_fast=False sends calls even when an API they depend on failed.
+
+        `profiler` (a profiler.RunProfiler) times the phases of the run and
+        writes them to results/<scenario>_profile.json; `metrics` (a
+        metrics.RunMetrics) counts the run's calls for its exporters.
+
+        The scenario's fixtures (fixtures/<scenario>_fixtures.json, see
+        fixtures.py) are loaded when the file exists.
+        """
+        if engine not in ("sync", "async"):
+            raise ValueError(f"Unknown engine '{engine}', expected 'sync' or 'async'")
+
+        api_config, env_config, api_interactions, plan, file_path = startEngine.loadScenario(scenario_name)
+        fixtures = load_fixtures(scenario_name, api_config)
+
+        if profiler is None:
+            profiler = Profiler()
+        profiler.start()
+
+        try:
+            if engine == "async":
+                # Imported lazily: only the async engine needs aiohttp
+                from execute_async import run_api_sequence_async
+                from transport import AsyncTransport
+
+                if transport is None:
+                    transport = AsyncTransport(pool_maxsize=max(100, parallel_iterations))
+
+                try:
+                    updated_api_interactions = run_api_sequence_async(api_config, env_config, api_interactions, scenario_name, listener, project_path, transport, parallel_iterations, plan, report_details, fail_fast, profiler, metrics, fixtures)
+                finally:
+                    transport.print_stats()
+
+            else:
+                if transport is None:
+                    transport = Transport(pool_maxsize=max(10, parallel_iterations * (len(api_interactions) if dag else 1)))
+
+                # Execute the API sequence
+                try:
+                    updated_api_interactions = execute_api_sequence(api_config, env_config, api_interactions, scenario_name, listener, project_path, transport, parallel_iterations, dag, respect_order, plan, report_details, fail_fast, profiler, metrics, fixtures)
+                finally:
+                    transport.print_stats()
+                    transport.close()
+        finally:
+            profiler.stop()
+            profiler.save(profile_path_for(scenario_name))
+            profiler.print_summary()
 
         
         with open(file_path, "w") as f:
             json.dump(updated_api_interactions, f, indent=4)
+
+    @staticmethod
+    def runLoad(scenario_name, project_path, profile, transport=None, dag=False, respect_order=None, fail_fast=True, metrics=None):
+        """
+        Runs a scenario as a load test (see load_runner.LoadProfile): virtual
+        users loop the scenario's testcases until the profile ends.
+        Writes results/<scenario>_load_summary.json and the load report, and
+        returns the summary.
+        The interactions file is left unchanged.
+        """
+        api_config, env_config, api_interactions, plan, _ = startEngine.loadScenario(scenario_name)
+        fixtures = load_fixtures(scenario_name, api_config)
+
+        sequence = [api for api in api_interactions.keys() if api != "ENV"]
+        test_case_data = load_test_case_data("testcases/testcases.json")[scenario_name]
+
+        if transport is None:
+            transport = Transport(pool_maxsize=profile.virtual_users * (len(sequence) if dag else 1))
+
+        ctx = RunContext(sequence, plan, test_case_data, transport=transport, env_config=env_config, verbose=False,
+                         fail_fast=fail_fast, metrics=metrics, fixtures=fixtures)
+        if dag:
+            ctx.graph = build_dependency_graph(api_interactions, sequence, respect_order)
+            ctx.api_executor = ThreadPoolExecutor(max_workers=profile.virtual_users * len(sequence))
+
+        try:
+            summary = run_load(ctx, profile)
+        finally:
+            if ctx.api_executor is not None:
+                ctx.api_executor.shutdown(wait=True)
+            transport.print_stats()
+            transport.close()
+
+        summary["scenario"] = scenario_name
+        print_load_summary(summary)
+
+        summary_path = load_summary_path_for(scenario_name)
+        os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+        with open(summary_path, "w") as f:
+            json.dump(summary, f, indent=4)
+
+        project_name = os.path.splitext(os.path.basename(project_path))[0]
+        generate_load_report_xlsx(project_name, scenario_name, summary_path)
+
+        return summary
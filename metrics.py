@@ -0,0 +1,273 @@
+"""
+Live run metrics in OpenMetrics / Prometheus text format.
+
+The engines report every call to the run's metrics: requests in flight,
+completed, failed by status code and skipped, a latency histogram and the
+bytes per API, retries and finished iterations. The default Metrics is a
+no-op. RunMetrics keeps the counters and renders them for scrapers, either
+over HTTP (MetricsServer, GET /metrics) or as a file for the node_exporter
+textfile collector (TextfileExporter).
+
+    python flowtest.py load ... --metrics-port 9464 --metrics-textfile /var/lib/node_exporter/flowtest.prom
+"""
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency histogram bucket bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metrics:
+    """
+    Metrics of a run. Every hook is a no-op, so runs without an exporter
+    pay nothing.
+    """
+
+    def request_started(self, api_name):
+        pass
+
+    def request_finished(self, api_name, safe_response):
+        pass
+
+    def request_skipped(self, api_name):
+        pass
+
+    def retried(self, api_name):
+        pass
+
+    def iteration_finished(self):
+        pass
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class RunMetrics(Metrics):
+    """
+    Counters, gauges and histograms of a run, keyed by API. `labels`
+    (e.g. {"scenario": "Test"}) are added to every sample.
+    """
+
+    def __init__(self, labels=None, buckets=LATENCY_BUCKETS):
+        self.labels = dict(labels or {})
+        self.buckets = tuple(buckets)
+        self.started_at = time.time()
+
+        self.in_flight = {}   # api -> requests sent and not answered yet
+        self.completed = {}   # api -> requests answered (or failed to send)
+        self.failed = {}   # (api, status) -> failed requests; status "none" without a response
+        self.skipped = {}   # api -> calls skipped because an upstream API failed
+        self.retries = {}   # api -> requests sent again
+        self.request_bytes = {}   # api -> bytes sent
+        self.response_bytes = {}   # api -> bytes received
+        self.latency = {}   # api -> [bucket counts (last is +Inf), sum in s, count]
+        self.iterations = 0
+        self._lock = threading.Lock()
+
+    def request_started(self, api_name):
+        with self._lock:
+            self.in_flight[api_name] = self.in_flight.get(api_name, 0) + 1
+
+    def request_finished(self, api_name, safe_response):
+        status_code = safe_response["status_code"]
+        timing = safe_response.get("timing")
+
+        with self._lock:
+            self.in_flight[api_name] = self.in_flight.get(api_name, 0) - 1
+            self.completed[api_name] = self.completed.get(api_name, 0) + 1
+
+            if status_code is None or status_code >= 400:
+                key = (api_name, str(status_code) if status_code is not None else "none")
+                self.failed[key] = self.failed.get(key, 0) + 1
+
+            if timing:
+                seconds = timing["total_ms"] / 1000
+                histogram = self.latency.get(api_name)
+                if histogram is None:
+                    histogram = self.latency[api_name] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                histogram[0][bisect.bisect_left(self.buckets, seconds)] += 1
+                histogram[1] += seconds
+                histogram[2] += 1
+
+                self.request_bytes[api_name] = self.request_bytes.get(api_name, 0) + (timing.get("request_bytes") or 0)
+                self.response_bytes[api_name] = self.response_bytes.get(api_name, 0) + (timing.get("response_bytes") or 0)
+
+    def request_skipped(self, api_name):
+        with self._lock:
+            self.skipped[api_name] = self.skipped.get(api_name, 0) + 1
+
+    def retried(self, api_name):
+        with self._lock:
+            self.retries[api_name] = self.retries.get(api_name, 0) + 1
+
+    def iteration_finished(self):
+        with self._lock:
+            self.iterations += 1
+
+    def _sample(self, name, value, labels=None):
+        labels = {**self.labels, **(labels or {})}
+        if labels:
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            return f"{name}{{{label_text}}} {_format_value(value)}"
+        return f"{name} {_format_value(value)}"
+
+    def render(self, openmetrics=True):
+        """
+        Returns the exposition text: OpenMetrics 1.0 when `openmetrics`, else
+        the Prometheus 0.0.4 text format (textfile collector).
+        """
+        lines = []
+
+        def family(name, metric_type, help_text, samples, counter=False):
+            # OpenMetrics names counter families without their _total suffix
+            family_name = name[:-len("_total")] if counter and openmetrics else name
+            lines.append(f"# HELP {family_name} {help_text}")
+            lines.append(f"# TYPE {family_name} {metric_type}")
+            lines.extend(samples)
+
+        with self._lock:
+            family("flowtest_run_start_time_seconds", "gauge", "Unix time the run started.",
+                   [self._sample("flowtest_run_start_time_seconds", round(self.started_at, 3))])
+            family("flowtest_iterations_completed_total", "counter", "Test iterations finished.",
+                   [self._sample("flowtest_iterations_completed_total", self.iterations)], counter=True)
+            family("flowtest_requests_in_flight", "gauge", "Requests sent and not answered yet.",
+                   [self._sample("flowtest_requests_in_flight", count, {"api": api})
+                    for api, count in self.in_flight.items()])
+            family("flowtest_requests_completed_total", "counter", "Requests answered or failed to send.",
+                   [self._sample("flowtest_requests_completed_total", count, {"api": api})
+                    for api, count in self.completed.items()], counter=True)
+            family("flowtest_requests_failed_total", "counter",
+                   "Requests without a response (status=\"none\") or with an error status.",
+                   [self._sample("flowtest_requests_failed_total", count, {"api": api, "status": status})
+                    for (api, status), count in self.failed.items()], counter=True)
+            family("flowtest_requests_skipped_total", "counter", "Calls not sent because an upstream API failed.",
+                   [self._sample("flowtest_requests_skipped_total", count, {"api": api})
+                    for api, count in self.skipped.items()], counter=True)
+            family("flowtest_retries_total", "counter", "Requests sent again.",
+                   [self._sample("flowtest_retries_total", count, {"api": api})
+                    for api, count in self.retries.items()], counter=True)
+            family("flowtest_request_bytes_total", "counter", "Bytes sent.",
+                   [self._sample("flowtest_request_bytes_total", count, {"api": api})
+                    for api, count in self.request_bytes.items()], counter=True)
+            family("flowtest_response_bytes_total", "counter", "Bytes received.",
+                   [self._sample("flowtest_response_bytes_total", count, {"api": api})
+                    for api, count in self.response_bytes.items()], counter=True)
+
+            samples = []
+            for api, (counts, total, count) in self.latency.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    samples.append(self._sample("flowtest_request_duration_seconds_bucket", cumulative,
+                                                {"api": api, "le": "+Inf" if bound == float("inf") else repr(float(bound))}))
+                samples.append(self._sample("flowtest_request_duration_seconds_sum", round(total, 6), {"api": api}))
+                samples.append(self._sample("flowtest_request_duration_seconds_count", count, {"api": api}))
+            family("flowtest_request_duration_seconds", "histogram", "Response time of the answered requests.", samples)
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Serves GET /metrics on a background thread. Scrapers that accept
+    OpenMetrics get it, others the Prometheus text format.
+    """
+
+    def __init__(self, metrics, host="127.0.0.1", port=9464):
+        self.metrics = metrics
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def _handler_class(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+
+                openmetrics = "application/openmetrics-text" in (self.headers.get("Accept") or "")
+                body = metrics.render(openmetrics).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"📡 Metrics served at {self.url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TextfileExporter:
+    """
+    Rewrites `path` with the metrics every `interval` seconds and once more
+    on stop(). Each write goes to a temporary file renamed over `path`, so
+    the textfile collector never reads a partial file.
+    """
+
+    def __init__(self, metrics, path, interval=5.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def write(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.metrics.render(openmetrics=False))
+        os.replace(tmp_path, self.path)
+
+    def _loop(self):
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+    def start(self):
+        self.write()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
+        print(f"📡 Metrics written to {self.path}")
@@ -0,0 +1,226 @@
+import hashlib
+import json
+
+from templates import compile_templates
+from utils import find_nested_path, get_first_match, get_path_value
+
+# Injection type -> section of the API config it writes into
+SECTIONS = {"H": "headers", "P": "params", "B": "body"}
+
+# (interactions file hash, api config hash) -> ExecutionPlan
+_plan_cache = {}
+
+
+class DependencyStep:
+    """
+    One value an API takes from an upstream response (or ENV):
+    `param` is looked up in `source_api`'s response and injected into the
+    slots of `section` whose value is param / eq.param.
+    """
+
+    __slots__ = ("source_api", "injection_type", "section", "param", "postgres")
+
+    def __init__(self, source_api, injection_type, param):
+        self.source_api = source_api
+        self.injection_type = injection_type
+        self.section = SECTIONS.get(injection_type)
+        self.postgres = "eq." in param
+        self.param = param.replace("eq.", "")
+
+
+class ExecutionPlan:
+    """
+    A scenario's interactions compiled once per run: for every API and
+    interaction level, the dependency steps, plus the request template of
+    every API (see templates.RequestTemplate).
+    Resolution keeps a per-iteration level cursor instead of popping the
+    level lists, and extraction paths into upstream responses are learned
+    once and then followed directly instead of searching the whole body.
+    """
+
+    def __init__(self, api_interactions, api_config):
+        self.levels = {}   # api_name -> [[DependencyStep, ...] per level]
+        self.templates = compile_templates(api_config)
+        self.consumed = {}   # source_api -> params other APIs take from its response
+        self.initial_values = {}   # (source_api, param) -> value from the stored "response"
+        self._paths = {}   # (source_api, param) -> path into the response
+
+        for api_name, interaction in api_interactions.items():
+            if api_name == "ENV":
+                continue
+            self.levels[api_name] = [
+                self._compile_level(interaction, level)
+                for level in interaction.get("level", [])
+            ]
+            for steps in self.levels[api_name]:
+                for step in steps:
+                    if step.source_api != "ENV":
+                        self.consumed.setdefault(step.source_api, set()).add(step.param)
+
+        # Before an API answers in an iteration, its dependents see the
+        # response stored in the interactions file (normally empty)
+        for source_api, params in self.consumed.items():
+            response = api_interactions.get(source_api, {}).get("response", {})
+            for param in params:
+                self.initial_values[(source_api, param)] = self.extract(source_api, param, response)
+
+    @staticmethod
+    def _compile_level(interaction, level):
+        return [
+            DependencyStep(output_api, injection_type, param)
+            for output_api in level
+            for injection_type, params in interaction.get(output_api, {}).items()
+            for param in params
+        ]
+
+    def extract(self, source_api, param, response):
+        """
+        Returns find_nested_value(response, param), following the cached
+        path when it still leads to the first match (see
+        utils.get_first_match) and searching the response again otherwise.
+        """
+        key = (source_api, param)
+        path = self._paths.get(key)
+        if path is not None:
+            value = get_first_match(response, path, param)
+            if value is not None:
+                return value
+
+        path = find_nested_path(response, param)
+        if path is None:
+            return None
+        self._paths[key] = path
+        return get_path_value(response, path)
+
+    def new_iteration(self):
+        return IterationState(self)
+
+    def upstream_apis(self, api_name, cursors):
+        """
+        Returns the APIs whose responses api_name's next call takes values
+        from (ENV excluded), without advancing its level cursor.
+        """
+        api_levels = self.levels.get(api_name)
+        position = cursors.get(api_name, 0)
+        if not api_levels or position >= len(api_levels):
+            return []
+        sources = []
+        for step in api_levels[position]:
+            if step.source_api != "ENV" and step.source_api not in sources:
+                sources.append(step.source_api)
+        return sources
+
+    def next_steps(self, api_name, cursors):
+        """
+        Returns the dependency steps of api_name's next call and advances its
+        level cursor (cursors is the iteration's {api_name: level index}).
+        """
+        api_levels = self.levels.get(api_name)
+        position = cursors.get(api_name, 0)
+        if not api_levels or position >= len(api_levels):
+            return []
+        cursors[api_name] = position + 1
+        return api_levels[position]
+
+    def resolve(self, api_name, state, env_config, input_values):
+        """
+        Plan based equivalent of resolve_dependencies_test: returns a fresh
+        request data dict of api_name rendered from its template, with the
+        upstream values of the iteration `state` and testcase inputs injected.
+        """
+        section_values = {}   # (section, param) -> value from an upstream response
+
+        for step in self.next_steps(api_name, state.cursors):
+            if step.source_api == "ENV":
+                value = env_config["ENV_VARIABLES"].get(step.param)
+            else:
+                value = state.value(step.source_api, step.param)
+
+            if not value:
+                continue
+
+            injected = f"eq.{value}" if step.postgres else value
+
+            if step.injection_type == "FI":
+                for key, val in env_config["ENV_VARIABLES"].items():
+                    if val == step.param or val == f"eq.{step.param}":
+                        env_config["ENV_VARIABLES"][key] = injected
+                        break
+                continue
+
+            # The first step providing a slot wins, as in resolve_dependencies_test
+            section_values.setdefault((step.section, step.param), injected)
+
+        template = self.templates.get(api_name)
+        if template is None:
+            return {}
+        return template.render(input_values, section_values)
+
+
+class IterationState:
+    """
+    State of one test iteration. The interaction definitions stay in the
+    shared plan; the state only holds the values extracted from this
+    iteration's responses and the level cursors, so creating one is O(1)
+    and response bodies are not kept once their values are extracted.
+    """
+
+    __slots__ = ("plan", "values", "cursors", "failed", "inputs", "failed_fixture")
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.values = {}    # (source_api, param) -> extracted value
+        self.cursors = {}   # api_name -> next interaction level
+        self.failed = set()   # APIs whose last call failed or was skipped
+        self.inputs = {}   # fixture values every call gets as testcase inputs; replaced, never changed
+        self.failed_fixture = None   # fixture the iteration could not resolve (set before its calls)
+
+    def record(self, api_name, response):
+        """
+        Extracts from api_name's response the values later APIs need.
+        """
+        plan = self.plan
+        for param in plan.consumed.get(api_name, ()):
+            self.values[(api_name, param)] = plan.extract(api_name, param, response)
+
+    def set_failed(self, api_name, failed):
+        if failed:
+            self.failed.add(api_name)
+        else:
+            self.failed.discard(api_name)
+
+    def failed_upstream(self, api_name):
+        """
+        Returns the first API api_name's next call depends on whose last
+        call failed in this iteration, or None.
+        """
+        for source_api in self.plan.upstream_apis(api_name, self.cursors):
+            if source_api in self.failed:
+                return source_api
+        return None
+
+    def value(self, source_api, param):
+        key = (source_api, param)
+        if key in self.values:
+            return self.values[key]
+        return self.plan.initial_values.get(key)
+
+
+def _hash(data):
+    if not isinstance(data, bytes):
+        data = json.dumps(data, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def get_execution_plan(interactions_source, api_interactions, api_config):
+    """
+    Returns the compiled plan of a scenario, cached by the hash of the
+    interactions file content (`interactions_source`, bytes, or the parsed
+    dict when no file content is at hand) and of the API config.
+    """
+    key = (_hash(interactions_source), _hash(api_config))
+    plan = _plan_cache.get(key)
+    if plan is None:
+        plan = ExecutionPlan(api_interactions, api_config)
+        _plan_cache[key] = plan
+    return plan
@@ -0,0 +1,393 @@
+"""
+Per-phase profiling and tracing of a run.
+
+The engines time every call's phases through the run's profiler: fixture
+calls, template resolution, dependency extraction, HTTP send/receive, JSON
+decoding, result persistence, UI notification and the report. The default
+Profiler is a no-op; RunProfiler keeps a sketch of each phase's durations
+and writes them to results/<scenario>_profile.json, optionally with a
+cProfile or tracemalloc capture of the run, and can stream a Chrome
+trace-event timeline of the run (open it in https://ui.perfetto.dev or
+chrome://tracing).
+"""
+import contextlib
+import contextvars
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from sketch import QuantileSketch
+
+PHASES = ("fixture", "resolve", "extract", "send", "decode", "persist", "notify", "report")
+
+_NO_PHASE = contextlib.nullcontext()
+
+# Trace track of the running code when it is not its thread's (asyncio iterations)
+_TRACK = contextvars.ContextVar("flowtest_trace_track", default=None)
+
+
+def profile_path_for(scenario_name, results_dir="results"):
+    """
+    Path of the run profile of a scenario: results/<scenario>_profile.json
+    """
+    return os.path.join(results_dir, f"{scenario_name}_profile.json")
+
+
+def trace_path_for(scenario_name, results_dir="results"):
+    """
+    Path of the trace-event timeline of a scenario: results/<scenario>_trace.json
+    """
+    return os.path.join(results_dir, f"{scenario_name}_trace.json")
+
+
+class Profiler:
+    """
+    Profiler of a run. Every hook is a no-op, so runs that are not profiled
+    only pay for an empty `with` block per phase.
+    """
+
+    def phase(self, name):
+        return _NO_PHASE
+
+    def span(self, name, category, track=None, args=None):
+        """
+        Timeline span around a block (an iteration, an API call). A span
+        with a `track` moves the code it wraps to that track.
+        """
+        return _NO_PHASE
+
+    def mark(self, name, args=None):
+        """
+        Instant event on the current track.
+        """
+        pass
+
+    def wait(self, name, since_ns, args=None):
+        """
+        Dependency wait from perf_counter_ns() `since_ns` until now.
+        """
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def save(self, path):
+        pass
+
+    def print_summary(self):
+        pass
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start_ns")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record(self.name, self.start_ns, time.perf_counter_ns())
+        return False
+
+
+class _Span:
+    __slots__ = ("trace", "name", "category", "track", "args", "start_ns", "token")
+
+    def __init__(self, trace, name, category, track, args):
+        self.trace = trace
+        self.name = name
+        self.category = category
+        self.track = track
+        self.args = args
+
+    def __enter__(self):
+        self.token = _TRACK.set(self.track) if self.track is not None else None
+        self.start_ns = time.perf_counter_ns()
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        args = self.args
+        if exc_type is not None:
+            args = {**(args or {}), "error": exc_type.__name__}
+        self.trace.complete(self.name, self.category, self.start_ns, end_ns, args)
+        if self.token is not None:
+            _TRACK.reset(self.token)
+        return False
+
+
+class TraceWriter:
+    """
+    Streams Chrome trace events (JSON object format) to `path`.
+
+    Events are buffered and appended to a temporary file that close() moves
+    over `path`, so the trace of a long run never has to fit in memory.
+    Tracks are threads, or the explicit track of the enclosing span (e.g.
+    "Iteration 3" on the asyncio engine). Timestamps are µs since the
+    writer was created.
+    """
+
+    def __init__(self, path, process_name="FlowTest", buffer_size=1000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.buffer_size = buffer_size
+        self.events = 0
+
+        self._origin_ns = time.perf_counter_ns()
+        self._tracks = {}   # track key -> tid
+        self._next_wait_id = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file = open(self.tmp_path, "w", encoding="utf-8")
+        self._file.write('{"displayTimeUnit":"ms","traceEvents":[\n')
+        self._file.write(json.dumps({"ph": "M", "name": "process_name", "pid": 1, "args": {"name": process_name}}))
+
+    def _tid(self):
+        # Called with the lock held
+        key = _TRACK.get()
+        if key is None:
+            key = threading.get_ident()
+            name = threading.current_thread().name
+        else:
+            name = key
+
+        tid = self._tracks.get(key)
+        if tid is None:
+            tid = self._tracks[key] = len(self._tracks) + 1
+            self._emit({"ph": "M", "name": "thread_name", "pid": 1, "tid": tid, "args": {"name": name}})
+            self._emit({"ph": "M", "name": "thread_sort_index", "pid": 1, "tid": tid, "args": {"sort_index": tid}})
+        return tid
+
+    def _us(self, ns):
+        return round((ns - self._origin_ns) / 1000, 3)
+
+    def _emit(self, event):
+        self._buffer.append(json.dumps(event, separators=(",", ":")))
+        self.events += 1
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._file.write(",\n" + ",\n".join(self._buffer))
+            self._buffer = []
+
+    def complete(self, name, category, start_ns, end_ns, args=None):
+        event = {"ph": "X", "name": name, "cat": category, "ts": self._us(start_ns),
+                 "dur": round((end_ns - start_ns) / 1000, 3), "pid": 1}
+        if args:
+            event["args"] = args
+        with self._lock:
+            event["tid"] = self._tid()
+            self._emit(event)
+
+    def instant(self, name, category, args=None):
+        event = {"ph": "i", "s": "t", "name": name, "cat": category, "ts": self._us(time.perf_counter_ns()), "pid": 1}
+        if args:
+            event["args"] = args
+        with self._lock:
+            event["tid"] = self._tid()
+            self._emit(event)
+
+    def interval(self, name, category, start_ns, end_ns, args=None):
+        """
+        Async (overlapping) slice: drawn on its own track, so it may overlap
+        the spans of the thread it was recorded on.
+        """
+        with self._lock:
+            self._next_wait_id += 1
+            tid = self._tid()
+            begin = {"ph": "b", "name": name, "cat": category, "id": self._next_wait_id, "ts": self._us(start_ns),
+                     "pid": 1, "tid": tid}
+            if args:
+                begin["args"] = args
+            self._emit(begin)
+            self._emit({"ph": "e", "name": name, "cat": category, "id": self._next_wait_id, "ts": self._us(end_ns),
+                        "pid": 1, "tid": tid})
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush()
+            self._file.write("\n]}\n")
+            self._file.close()
+            os.replace(self.tmp_path, self.path)
+
+
+class RunProfiler(Profiler):
+    """
+    Times the phases of a run: per phase a QuantileSketch of durations in
+    µs, summed over all threads (with parallel iterations the phase totals
+    can exceed the wall time).
+
+    cpu=True captures a cProfile of the thread that calls start(), the
+    whole run for sequential and asyncio runs (the worker threads of
+    parallel iterations are not captured); memory=True traces allocations
+    with tracemalloc. `top` is the number of functions / allocation sites
+    kept in the profile file.
+
+    trace_path: also stream a trace-event timeline of the run there: a
+    span per iteration and API call with the phases nested inside, marks
+    for skipped calls and dependency waits of dependency-graph runs.
+    """
+
+    def __init__(self, cpu=False, memory=False, top=30, trace_path=None):
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.trace_path = trace_path
+        self.trace = None
+
+        self.phases = {name: QuantileSketch() for name in PHASES}
+        self.started_at = None
+        self.wall_ms = None
+        self._start_ns = None
+        self._cprofile = None
+        self._cpu_stats = None
+        self._memory_top = None
+        self._memory_peak = None
+        self._lock = threading.Lock()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def record(self, name, start_ns, end_ns):
+        with self._lock:
+            sketch = self.phases.get(name)
+            if sketch is None:
+                sketch = self.phases[name] = QuantileSketch()
+            sketch.add((end_ns - start_ns) / 1000)
+        if self.trace is not None:
+            self.trace.complete(name, "phase", start_ns, end_ns)
+
+    def span(self, name, category, track=None, args=None):
+        if self.trace is None:
+            return _NO_PHASE
+        return _Span(self.trace, name, category, track, args)
+
+    def mark(self, name, args=None):
+        if self.trace is not None:
+            self.trace.instant(name, "mark", args)
+
+    def wait(self, name, since_ns, args=None):
+        if self.trace is not None:
+            self.trace.interval(name, "wait", since_ns, time.perf_counter_ns(), args)
+
+    def start(self):
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        if self.trace_path is not None:
+            self.trace = TraceWriter(self.trace_path)
+        if self.memory:
+            tracemalloc.start()
+        if self.cpu:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._start_ns = time.perf_counter_ns()
+
+    def stop(self):
+        if self._start_ns is None:
+            return
+        self.wall_ms = (time.perf_counter_ns() - self._start_ns) / 1e6
+        self._start_ns = None
+
+        if self.trace is not None:
+            self.trace.close()
+            print(f"🧭 Trace of {self.trace.events} events written to {self.trace.path}")
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cpu_stats = pstats.Stats(self._cprofile)
+            self._cprofile = None
+
+        if self.memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            self._memory_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self._memory_top = snapshot.statistics("lineno")[:self.top]
+
+    def summary(self):
+        phases = {}
+        for name, sketch in self.phases.items():
+            if not sketch.count:
+                continue
+            phases[name] = {
+                "count": sketch.count,
+                "total_ms": round(sketch.sum / 1000, 3),
+                "mean_us": round(sketch.mean, 1),
+                "p50_us": round(sketch.quantile(0.5), 1),
+                "p99_us": round(sketch.quantile(0.99), 1),
+                "max_us": round(sketch.max, 1),
+                "share_of_wall": round(sketch.sum / 1000 / self.wall_ms, 4) if self.wall_ms else None,
+            }
+
+        summary = {
+            "started_at": self.started_at,
+            "wall_ms": round(self.wall_ms, 3) if self.wall_ms is not None else None,
+            "phases": phases,
+        }
+
+        if self._cpu_stats is not None:
+            stats = self._cpu_stats.stats
+            by_cumulative = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top]
+            summary["cpu"] = [
+                {
+                    "function": f"{filename}:{line}({function})",
+                    "calls": calls,
+                    "tottime_ms": round(tottime * 1000, 3),
+                    "cumtime_ms": round(cumtime * 1000, 3),
+                }
+                for (filename, line, function), (_, calls, tottime, cumtime, _) in by_cumulative
+            ]
+
+        if self._memory_top is not None:
+            summary["memory"] = {
+                "peak_mb": round(self._memory_peak / 2**20, 2),
+                "top": [
+                    {"location": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+                    for stat in self._memory_top
+                ],
+            }
+
+        return summary
+
+    def save(self, path):
+        """
+        Writes the profile summary to `path`. With cpu=True the full
+        cProfile stats also go next to it (.prof, readable with pstats or
+        snakeviz).
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        summary = self.summary()
+
+        if self._cpu_stats is not None:
+            stats_path = os.path.splitext(path)[0] + ".prof"
+            self._cpu_stats.dump_stats(stats_path)
+            summary["cpu_stats_path"] = stats_path
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=4)
+        os.replace(tmp_path, path)
+        print(f"⏱ Profile written to {path}")
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"\n=== Profile: {summary['wall_ms']} ms wall ===")
+        for name, stats in summary["phases"].items():
+            share = f", {stats['share_of_wall']:.1%} of wall" if stats["share_of_wall"] is not None else ""
+            print(f"⏱ {name}: {stats['count']} × {stats['mean_us']} µs (p99 {stats['p99_us']} µs), "
+                  f"{stats['total_ms']} ms{share}")
+        if "memory" in summary:
+            print(f"🧠 Peak traced memory: {summary['memory']['peak_mb']} MB")
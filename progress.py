@@ -0,0 +1,55 @@
+class RunCancelled(Exception):
+    """
+    Raised by the engines when their listener asked to stop the run.
+    """
+
+
+class ProgressListener:
+    """
+    Receives execution progress from execute_api_sequence.
+    Every hook is a no-op, so listeners only override what they need.
+    """
+
+    def cancelled(self):
+        """
+        Checked by the engines before every call; True stops the run with
+        RunCancelled.
+        """
+        return False
+
+    def on_run_start(self, sequence, total_iterations):
+        pass
+
+    def on_progress(self, api_index, api_name, test_index, total_iterations):
+        pass
+
+    def on_status(self, api_index, api_name, passed, failed, skipped=0):
+        """
+        Final counts of an API: `skipped` calls were not sent because an
+        upstream API failed, and are not counted in `failed`.
+        """
+        pass
+
+    def on_run_end(self):
+        pass
+
+
+class SummaryListener(ProgressListener):
+    """
+    Collects the final passed/failed/skipped counts per API (used by the CLI
+    exit code).
+    """
+
+    def __init__(self):
+        self.status = {}
+
+    def on_status(self, api_index, api_name, passed, failed, skipped=0):
+        self.status[api_name] = (passed, failed, skipped)
+
+    @property
+    def failed(self):
+        return sum(fail for _, fail, _ in self.status.values())
+
+    @property
+    def skipped(self):
+        return sum(skipped for _, _, skipped in self.status.values())
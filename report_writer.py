@@ -0,0 +1,146 @@
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+
+# Named styles of the reports, registered once per workbook
+BOLD = "FlowTest Bold"
+HEADER = "FlowTest Header"
+SECTION = "FlowTest Section"
+CENTER = "FlowTest Center"
+LEFT = "FlowTest Left"
+
+
+def _named_styles():
+    bold = NamedStyle(BOLD)
+    bold.font = Font(bold=True)
+
+    header = NamedStyle(HEADER)
+    header.font = Font(bold=True, color="FFFFFF")
+    header.fill = PatternFill("solid", fgColor="4F81BD")  # blue header
+    header.alignment = Alignment(horizontal="center", vertical="center")
+
+    section = NamedStyle(SECTION)
+    section.font = Font(bold=True)
+    section.fill = PatternFill("solid", fgColor="D9D9D9")  # light grey for section titles
+
+    center = NamedStyle(CENTER)
+    center.alignment = Alignment(horizontal="center", vertical="center")
+
+    left = NamedStyle(LEFT)
+    left.alignment = Alignment(horizontal="left", vertical="center")
+
+    return [bold, header, section, center, left]
+
+
+def new_report_workbook():
+    """
+    Returns a write-only workbook with the report's named styles.
+    Cells only reference a named style, so styling costs no per-cell
+    style objects.
+    """
+    wb = Workbook(write_only=True)
+    for style in _named_styles():
+        wb.add_named_style(style)
+    return wb
+
+
+class SheetWriter:
+    """
+    Streams rows into a write-only worksheet.
+
+    Write-only sheets need their column widths before the first row is
+    written, so the first `sample_rows` rows are buffered while their
+    widths are measured; the widths are then fixed and every later row goes
+    straight to the file. Sheets shorter than the sample get exact widths,
+    and memory stays bounded whatever the number of rows.
+    """
+
+    def __init__(self, wb, title, sample_rows=1000, max_width=60):
+        self.ws = wb.create_sheet(title)
+        self.sample_rows = sample_rows
+        self.max_width = max_width
+
+        self.row_count = 0
+        self._buffer = []
+        self._widths = {}   # column index -> longest value length
+        self._cells = {}   # (column index, style) -> reused styled cell
+
+    def row(self, *cells, style=None):
+        """
+        Appends a row and returns its number. A cell is a value or a
+        (value, style name) pair; `style` applies to plain values.
+        """
+        streaming = self._buffer is None
+        row = []
+        for col_idx, cell in enumerate(cells, start=1):
+            if isinstance(cell, tuple):
+                value, cell_style = cell
+            else:
+                value, cell_style = cell, style
+
+            if not streaming and value is not None:
+                length = len(str(value))
+                if length > self._widths.get(col_idx, 0):
+                    self._widths[col_idx] = length
+
+            if cell_style is None:
+                row.append(value)
+            elif streaming:
+                # Rows are serialized as soon as they are appended, so one
+                # styled cell per column and style is reused
+                write_cell = self._cells.get((col_idx, cell_style))
+                if write_cell is None:
+                    write_cell = self._cells[(col_idx, cell_style)] = WriteOnlyCell(self.ws)
+                    write_cell.style = cell_style
+                write_cell.value = value
+                row.append(write_cell)
+            else:
+                write_cell = WriteOnlyCell(self.ws, value=value)
+                write_cell.style = cell_style
+                row.append(write_cell)
+
+        self.row_count += 1
+        if self._buffer is None:
+            self.ws.append(row)
+        else:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.sample_rows:
+                self._flush()
+        return self.row_count
+
+    def blank(self):
+        return self.row()
+
+    def label(self, label, value):
+        """
+        Bold label in column A, value in column B.
+        """
+        return self.row((label, BOLD), value)
+
+    def section(self, title):
+        return self.row((title, SECTION))
+
+    def header(self, titles):
+        return self.row(*titles, style=HEADER)
+
+    def table_row(self, values):
+        """
+        Data row: first column left aligned, the others centered.
+        """
+        return self.row((values[0], LEFT), *((value, CENTER) for value in values[1:]))
+
+    def _flush(self):
+        # Fix the widths measured so far, then write the buffered rows
+        for col_idx, length in self._widths.items():
+            # Add some padding
+            if length > 0:
+                width = min(length + 4, self.max_width)
+                self.ws.column_dimensions[get_column_letter(col_idx)].width = width
+        for row in self._buffer:
+            self.ws.append(row)
+        self._buffer = None
+
+    def close(self):
+        if self._buffer is not None:
+            self._flush()
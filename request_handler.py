@@ -1,15 +1,26 @@
 import requests
+from transport import Transport
+
+# Shared transport for callers that do not pass the transport of their run
+_default_transport = None
+
+
+def get_default_transport():
+    global _default_transport
+    if _default_transport is None:
+        _default_transport = Transport()
+    return _default_transport
+
+
+def make_request(api_data, transport=None):
+    if transport is None:
+        transport = get_default_transport()
 
-def make_request(api_data):
-    method = api_data["method"]
     url = api_data["url"] + api_data["path"]
-    headers = api_data.get("headers", {})
-    params = api_data.get("params", {})
-    body = api_data.get("body", {})
 
     try:
-        response = requests.request(method, url, headers=headers, params=params, json=body)
+        response = transport.send(api_data)
         return response
     except requests.exceptions.RequestException as e:
         print(f"Error calling {url}: {e}")
-        return f"Error calling {url}: {e}"
\ No newline at end of file
+        return f"Error calling {url}: {e}"
@@ -0,0 +1,103 @@
+import json
+import os
+
+
+def results_path_for(scenario_name, results_dir="results"):
+    """
+    Path of the JSONL results file of a scenario: results/<scenario>_results.jsonl
+    """
+    return os.path.join(results_dir, f"{scenario_name}_results.jsonl")
+
+
+class ResultsStore:
+    """
+    Append-only results of one scenario run.
+
+    Every result is one JSON line {"api", "index", "result"}. Lines are
+    buffered and appended to a temporary file; close() moves it over the
+    scenario's results file in one os.replace, so readers never see a
+    half-written run. If the run fails the previous results stay in place
+    and the partial run is left in the .tmp file.
+    """
+
+    def __init__(self, scenario_name, results_dir="results", buffer_size=500):
+        os.makedirs(results_dir, exist_ok=True)
+
+        self.path = results_path_for(scenario_name, results_dir)
+        self.tmp_path = self.path + ".tmp"
+        self.buffer_size = buffer_size
+
+        self._buffer = []
+        self._file = open(self.tmp_path, "w", encoding="utf-8")
+
+    def append(self, api_name, test_index, response_data):
+        """
+        Records the result of testcase `test_index` (0-based) of `api_name`.
+        """
+        record = {"api": api_name, "index": str(test_index + 1), "result": response_data}
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer = []
+
+    def close(self):
+        """
+        Flushes the remaining results and publishes the file atomically.
+        """
+        if self._file.closed:
+            return
+
+        self.flush()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """
+        Stops writing without replacing the previous results.
+        """
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def iter_results(path):
+    """
+    Streams a JSONL results file: yields (api_name, index, result) per line,
+    index being the 1-based testcase number as a string.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            yield record["api"], record["index"], record["result"]
+
+
+def load_results(path):
+    """
+    Reads a JSONL results file into the results.json scenario layout:
+    {api_name: {"1": result, "2": result, ...}}. A later line for the same
+    API and index wins.
+    """
+    scenario_data = {}
+    for api_name, index, result in iter_results(path):
+        scenario_data.setdefault(api_name, {})[index] = result
+    return scenario_data
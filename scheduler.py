@@ -0,0 +1,78 @@
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+def build_dependency_graph(api_interactions, sequence, respect_order=None):
+    """
+    Builds {api_name: set(upstream api names)} for one iteration from the
+    interaction levels. An API is called once per iteration, so only its
+    first level list is resolved (see resolve_dependencies_test).
+
+    respect_order keeps declared order for APIs with side effects:
+    True applies it to every API, a collection of API names only to those.
+    Such an API also waits for every API declared before it.
+    Raises ValueError when the interactions contain a dependency cycle.
+    """
+    known = set(sequence)
+    graph = {}
+
+    for position, api_name in enumerate(sequence):
+        levels = api_interactions.get(api_name, {}).get("level") or []
+        first_level = levels[0] if levels else []
+        upstream = {api for api in first_level if api in known and api != api_name}
+
+        if respect_order is True or (respect_order and api_name in respect_order):
+            upstream.update(sequence[:position])
+
+        graph[api_name] = upstream
+
+    # Kahn's algorithm, only to reject cycles before anything is sent
+    remaining = {api: set(upstream) for api, upstream in graph.items()}
+    ready = [api for api, upstream in remaining.items() if not upstream]
+    visited = 0
+    while ready:
+        api_name = ready.pop()
+        visited += 1
+        for other, upstream in remaining.items():
+            if api_name in upstream:
+                upstream.discard(api_name)
+                if not upstream:
+                    ready.append(other)
+
+    if visited != len(graph):
+        cyclic = sorted(api for api, upstream in remaining.items() if upstream)
+        raise ValueError(f"Dependency cycle in interactions, unresolvable APIs: {', '.join(cyclic)}")
+
+    return graph
+
+
+def run_graph(sequence, graph, run_api, executor):
+    """
+    Runs run_api(api_name) for every API of the sequence on `executor`,
+    submitting each API as soon as all of its upstream APIs finished.
+    Returns {api_name: run_api result}.
+    """
+    remaining = {api: set(graph[api]) for api in sequence}
+    dependents = {api: [] for api in sequence}
+    for api_name in sequence:
+        for upstream in graph[api_name]:
+            dependents[upstream].append(api_name)
+
+    results = {}
+    pending = {}
+
+    for api_name in sequence:
+        if not remaining[api_name]:
+            pending[executor.submit(run_api, api_name)] = api_name
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            api_name = pending.pop(future)
+            results[api_name] = future.result()
+
+            for downstream in dependents[api_name]:
+                remaining[downstream].discard(api_name)
+                if not remaining[downstream]:
+                    pending[executor.submit(run_api, downstream)] = downstream
+
+    return results
@@ -0,0 +1,347 @@
+import json
+import math
+import os
+import threading
+
+# Most throughput buckets a LatencyAggregator keeps; past that they widen
+MAX_TIMELINE_BUCKETS = 3600
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative accuracy (DDSketch).
+
+    Values are counted in logarithmic buckets: bucket i covers
+    (gamma^(i-1), gamma^i] with gamma = (1 + accuracy) / (1 - accuracy), so
+    any quantile is returned within `accuracy` relative error. add() is O(1)
+    and memory is bounded by max_buckets: past that, the lowest buckets are
+    collapsed into one, which only costs accuracy on the lowest quantiles.
+    Sketches with the same accuracy merge by adding bucket counts.
+    """
+
+    def __init__(self, accuracy=0.01, max_buckets=2048):
+        self.accuracy = accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+
+        self.buckets = {}   # bucket index -> count
+        self.zero_count = 0   # values <= 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        if value > 0:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            buckets = self.buckets
+            if index in buckets:
+                buckets[index] += 1
+            else:
+                buckets[index] = 1
+                if len(buckets) > self.max_buckets:
+                    self._collapse()
+        else:
+            self.zero_count += 1
+
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def _collapse(self):
+        # Fold the lowest buckets into the lowest one that is kept
+        indices = sorted(self.buckets)
+        excess = len(indices) - self.max_buckets
+        target = indices[excess]
+        for index in indices[:excess]:
+            self.buckets[target] += self.buckets.pop(index)
+
+    def merge(self, other):
+        """
+        Adds the values counted by another sketch of the same accuracy.
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        if not other.count:
+            return
+
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q):
+        """
+        Value at quantile q (0..1), None when the sketch is empty.
+        """
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return self.min if self.min < 0 else 0
+
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Middle of the bucket, relative to its bounds
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+
+        return self.max
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def to_dict(self):
+        return {
+            "accuracy": self.accuracy,
+            "max_buckets": self.max_buckets,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["accuracy"], data["max_buckets"])
+        sketch.buckets = {int(index): count for index, count in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        return sketch
+
+
+def latency_path_for(scenario_name, results_dir="results"):
+    """
+    Path of the latency sketches of a scenario: results/<scenario>_latency.json
+    """
+    return os.path.join(results_dir, f"{scenario_name}_latency.json")
+
+
+class LatencyAggregator:
+    """
+    Thread-safe response time aggregation of a run, per API and status code
+    ("error" when no response arrived): total and TTFB sketches in ms, plus
+    reused connection and byte counts. Only results carrying a "timing"
+    entry (see transport.build_timing) are counted.
+
+    It also keeps the span of the run (first request start, last response
+    end) and the number of responses completed in every `bucket_s` seconds,
+    for throughput figures. Buckets start at one second and double in width
+    whenever the run spans more than MAX_TIMELINE_BUCKETS of them.
+
+    Memory is bounded by the number of (API, status) pairs plus
+    MAX_TIMELINE_BUCKETS, whatever the number of requests or the length of
+    the run. Aggregators of several threads or processes merge with
+    merge() / from_dict().
+    """
+
+    def __init__(self, accuracy=0.01):
+        self.accuracy = accuracy
+        self.entries = {}   # (api_name, status) -> {"total", "ttfb", "reused", "bytes"}
+        self.per_second = {}   # clock second the bucket starts at -> [responses, non-2xx responses]
+        self.bucket_s = 1
+        self.first_start_ns = None
+        self.last_end_ns = None
+        self._lock = threading.Lock()
+
+    def _count_second(self, second, responses, errors):
+        # Called with the lock held
+        key = second - second % self.bucket_s
+        counts = self.per_second.get(key)
+        if counts is not None:
+            counts[0] += responses
+            counts[1] += errors
+            return
+
+        self.per_second[key] = [responses, errors]
+        # A new bucket (about once per bucket_s) may stretch the span
+        if (max(self.per_second) - min(self.per_second)) // self.bucket_s >= MAX_TIMELINE_BUCKETS:
+            self._widen(self.bucket_s * 2)
+
+    def _widen(self, bucket_s):
+        # Called with the lock held; merges the buckets into wider ones
+        while True:
+            per_second = {}
+            for second, (responses, errors) in self.per_second.items():
+                counts = per_second.setdefault(second - second % bucket_s, [0, 0])
+                counts[0] += responses
+                counts[1] += errors
+            self.per_second = per_second
+            self.bucket_s = bucket_s
+            if not per_second or (max(per_second) - min(per_second)) // bucket_s < MAX_TIMELINE_BUCKETS:
+                return
+            bucket_s *= 2
+
+    def _entry(self, api_name, status):
+        key = (api_name, status)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = {
+                "total": QuantileSketch(self.accuracy),
+                "ttfb": QuantileSketch(self.accuracy),
+                "reused": 0,
+                "bytes": 0,
+            }
+        return entry
+
+    def record(self, api_name, safe_response):
+        """
+        Counts the timing of one stored result (see execute.to_safe_response).
+        """
+        timing = safe_response.get("timing")
+        if not timing:
+            return
+
+        status = safe_response.get("status_code")
+        status = str(status) if status is not None else "error"
+
+        with self._lock:
+            entry = self._entry(api_name, status)
+            entry["total"].add(timing["total_ms"])
+            entry["ttfb"].add(timing["ttfb_ms"])
+            if timing.get("connection_reused"):
+                entry["reused"] += 1
+            entry["bytes"] += timing.get("request_bytes", 0) + timing.get("response_bytes", 0)
+
+            start_ns, end_ns = timing["start_ns"], timing["end_ns"]
+            if self.first_start_ns is None or start_ns < self.first_start_ns:
+                self.first_start_ns = start_ns
+            if self.last_end_ns is None or end_ns > self.last_end_ns:
+                self.last_end_ns = end_ns
+
+            self._count_second(end_ns // 1_000_000_000, 1, 0 if status.startswith("2") else 1)
+
+    @property
+    def duration_s(self):
+        """
+        Seconds from the first request start to the last response end.
+        """
+        if self.first_start_ns is None:
+            return 0.0
+        return (self.last_end_ns - self.first_start_ns) / 1e9
+
+    def timeline(self):
+        """
+        Returns [(second, responses, non-2xx responses), ...] per bucket of
+        `bucket_s` seconds, with seconds counted from the start of the run,
+        including idle buckets.
+        """
+        with self._lock:
+            if not self.per_second:
+                return []
+            first = min(self.per_second)
+            last = max(self.per_second)
+            return [(second - first, *self.per_second.get(second, (0, 0)))
+                    for second in range(first, last + 1, self.bucket_s)]
+
+    def merge(self, other):
+        """
+        Adds another aggregator's counts. Run spans and seconds are only
+        comparable for aggregators of the same process (same clock).
+        """
+        with self._lock:
+            if other.bucket_s > self.bucket_s:
+                self._widen(other.bucket_s)
+            for second, (responses, errors) in other.per_second.items():
+                self._count_second(second, responses, errors)
+            if other.first_start_ns is not None:
+                if self.first_start_ns is None or other.first_start_ns < self.first_start_ns:
+                    self.first_start_ns = other.first_start_ns
+                if self.last_end_ns is None or other.last_end_ns > self.last_end_ns:
+                    self.last_end_ns = other.last_end_ns
+            for (api_name, status), other_entry in other.entries.items():
+                entry = self._entry(api_name, status)
+                entry["total"].merge(other_entry["total"])
+                entry["ttfb"].merge(other_entry["ttfb"])
+                entry["reused"] += other_entry["reused"]
+                entry["bytes"] += other_entry["bytes"]
+
+    def by_api(self):
+        """
+        Returns {api_name: entry} with the status codes of every API merged,
+        in recording order.
+        """
+        merged = LatencyAggregator(self.accuracy)
+        with self._lock:
+            for (api_name, _), entry in self.entries.items():
+                target = merged._entry(api_name, None)
+                target["total"].merge(entry["total"])
+                target["ttfb"].merge(entry["ttfb"])
+                target["reused"] += entry["reused"]
+                target["bytes"] += entry["bytes"]
+        return {api_name: entry for (api_name, _), entry in merged.entries.items()}
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "accuracy": self.accuracy,
+                "first_start_ns": self.first_start_ns,
+                "last_end_ns": self.last_end_ns,
+                "per_second": {str(second): counts for second, counts in self.per_second.items()},
+                "bucket_s": self.bucket_s,
+                "entries": [
+                    {
+                        "api": api_name,
+                        "status": status,
+                        "total": entry["total"].to_dict(),
+                        "ttfb": entry["ttfb"].to_dict(),
+                        "reused": entry["reused"],
+                        "bytes": entry["bytes"],
+                    }
+                    for (api_name, status), entry in self.entries.items()
+                ],
+            }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregator = cls(data["accuracy"])
+        aggregator.first_start_ns = data.get("first_start_ns")
+        aggregator.last_end_ns = data.get("last_end_ns")
+        aggregator.per_second = {int(second): counts for second, counts in data.get("per_second", {}).items()}
+        aggregator.bucket_s = data.get("bucket_s", 1)
+        for item in data["entries"]:
+            aggregator.entries[(item["api"], item["status"])] = {
+                "total": QuantileSketch.from_dict(item["total"]),
+                "ttfb": QuantileSketch.from_dict(item["ttfb"]),
+                "reused": item["reused"],
+                "bytes": item["bytes"],
+            }
+        return aggregator
+
+    def save(self, path):
+        """
+        Writes the sketches to `path` (tmp file + os.replace).
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,235 @@
+"""
+Local stub HTTP server generated from api_config_new.json.
+
+Every (method, path) of the config becomes a route. By default the stub
+behaves like PostgREST on an in-memory table per path: POST inserts the
+body and returns [{"id": ..., ...}], GET / PATCH / DELETE filter rows with
+"column=eq.value" query params. With echo=True every route answers the
+request's params and body instead. Latency follows a configurable
+distribution and a share of requests can fail with an error status; both
+are seeded, so runs are reproducible.
+
+    python flowtest.py stub --port 8000 --latency lognormal:20:0.5 --error-rate 0.01
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+from templates import PLACEHOLDER_PATTERN
+
+
+def parse_latency(spec):
+    """
+    Latency distribution from a spec, in ms:
+    "fixed:20", "uniform:10:50", "normal:MEAN:STDDEV",
+    "lognormal:MEDIAN:SIGMA", "exponential:MEAN". None or "0" means none.
+    Returns a function of a random.Random returning a delay in ms.
+    """
+    if not spec or spec == "0":
+        return lambda rng: 0.0
+
+    name, *values = spec.split(":")
+    try:
+        values = [float(value) for value in values]
+    except ValueError:
+        raise ValueError(f"Invalid latency '{spec}'")
+
+    distributions = {
+        "fixed": (1, lambda rng, ms: ms),
+        "uniform": (2, lambda rng, low, high: rng.uniform(low, high)),
+        "normal": (2, lambda rng, mean, stddev: rng.gauss(mean, stddev)),
+        "lognormal": (2, lambda rng, median, sigma: median * rng.lognormvariate(0, sigma)),
+        "exponential": (1, lambda rng, mean: rng.expovariate(1 / mean) if mean else 0.0),
+    }
+    if name not in distributions or len(values) != distributions[name][0]:
+        raise ValueError(f"Invalid latency '{spec}', expected e.g. fixed:20, uniform:10:50, normal:20:5, "
+                         "lognormal:20:0.5 or exponential:20")
+
+    sample = distributions[name][1]
+    return lambda rng: max(sample(rng, *values), 0.0)
+
+
+def _path_pattern(path):
+    # {{placeholder}} segments match any value
+    parts = PLACEHOLDER_PATTERN.split(path)
+    return re.compile("^" + "[^/]+".join(re.escape(part) for part in parts) + "$")
+
+
+def stub_config(api_config, base_url):
+    """
+    Returns a copy of api_config with every API pointed at base_url.
+    """
+    return {api_name: {**entry, "url": base_url} for api_name, entry in api_config.items()}
+
+
+class StubServer:
+    """
+    Stub server of an api_config. start() serves on a background thread,
+    `url` is the base URL to put in the config (see stub_config).
+
+    ids: "uuid" or "int" (sequential per table) for inserted rows.
+    error_rate: share of requests answered with error_status.
+    """
+
+    def __init__(self, api_config, host="127.0.0.1", port=0, latency=None, error_rate=0.0, error_status=500,
+                 ids="uuid", echo=False, seed=None):
+        if ids not in ("uuid", "int"):
+            raise ValueError(f"Unknown id mode '{ids}', expected 'uuid' or 'int'")
+
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.ids = ids
+        self.echo = echo
+
+        self.routes = []   # [(method, path pattern, table name)]
+        for entry in api_config.values():
+            method = entry.get("method", "GET").upper()
+            path = entry.get("path", "/") or "/"
+            route = (method, path)
+            if route not in [(m, p) for m, _, p in self.routes]:
+                self.routes.append((method, _path_pattern(path), path))
+
+        self.tables = {}   # table (config path) -> [row, ...]
+        self.next_ids = {}   # table -> next int id
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; with Nagle's algorithm
+            # the body waits for the client's delayed ACK on kept-alive
+            # connections (~40 ms per request)
+            disable_nagle_algorithm = True
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                status, payload = stub.handle(self.command, self.path, self.headers, raw_body)
+
+                body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def handle(self, method, raw_path, headers, raw_body):
+        """
+        Answers one request: returns (status, JSON payload or None).
+        """
+        with self._lock:
+            self.requests += 1
+            delay_ms = self.latency(self._rng)
+            fail = self.error_rate and self._rng.random() < self.error_rate
+
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+        parsed = urlparse(raw_path)
+        params = dict(parse_qsl(parsed.query))
+
+        table = None
+        for route_method, pattern, path in self.routes:
+            if route_method == method and pattern.match(parsed.path):
+                table = path
+                break
+        if table is None:
+            return 404, {"message": f"No route for {method} {parsed.path}"}
+
+        if fail:
+            return self.error_status, {"message": "Injected error"}
+
+        try:
+            body = json.loads(raw_body) if raw_body else None
+        except ValueError:
+            return 400, {"message": "Invalid JSON body"}
+
+        if self.echo:
+            return (201 if method == "POST" else 200), {"method": method, "path": parsed.path, "params": params,
+                                                        "body": body}
+
+        representation = method == "GET" or "return=representation" in (headers.get("Prefer") or "")
+        rows = self._apply(method, table, params, body)
+        if not representation:
+            return (201 if method == "POST" else 204), None
+        return (201 if method == "POST" else 200), rows
+
+    def _new_id(self, table):
+        if self.ids == "int":
+            next_id = self.next_ids.get(table, 1)
+            self.next_ids[table] = next_id + 1
+            return next_id
+        return str(uuid.UUID(int=self._rng.getrandbits(128), version=4))
+
+    def _apply(self, method, table, params, body):
+        # PostgREST style filters: column=eq.value
+        filters = {key: value[3:] for key, value in params.items() if value.startswith("eq.")}
+
+        def matches(row):
+            return all(str(row.get(key)) == value for key, value in filters.items())
+
+        with self._lock:
+            rows = self.tables.setdefault(table, [])
+
+            if method == "POST":
+                inserted = []
+                for record in body if isinstance(body, list) else [body or {}]:
+                    row = {"id": self._new_id(table), **record} if isinstance(record, dict) else {"id": self._new_id(table)}
+                    rows.append(row)
+                    inserted.append(row)
+                return inserted
+
+            selected = [row for row in rows if matches(row)]
+
+            if method in ("PATCH", "PUT"):
+                for row in selected:
+                    row.update(body or {})
+            elif method == "DELETE":
+                self.tables[table] = [row for row in rows if not matches(row)]
+
+            return [dict(row) for row in selected]
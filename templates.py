@@ -0,0 +1,117 @@
+import copy
+import re
+
+# {{name}} placeholders inside a string
+PLACEHOLDER_PATTERN = re.compile(r"\{\{[^{}]+\}\}")
+
+# Parts of an API config that are templated
+TEMPLATE_FIELDS = ("url", "path", "headers", "params", "body")
+
+
+def _fresh(value):
+    # Copies dicts and lists; strings and numbers are immutable and shared
+    if isinstance(value, dict):
+        return {key: _fresh(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fresh(item) for item in value]
+    return value
+
+
+class RequestTemplate:
+    """
+    One API config compiled into an immutable template.
+
+    Every string value is indexed as a slot: whole values ("{{apiKey}}",
+    "id") and "eq." values ("eq.id") by name, strings with {{placeholders}}
+    among other text ("Bearer {{token}}", "/users/{{userId}}") as text slots.
+    Slots cover nested body fields, url and path. render() touches only the
+    slots that receive a value on a fresh copy of the containers, so every
+    request is a new structure and the template never changes.
+    """
+
+    def __init__(self, api_config_entry):
+        self._config = copy.deepcopy(api_config_entry)
+        self._whole = {}        # name -> [(path, is_eq), ...]
+        self._text = []         # [(path, parts)], parts alternate literal / placeholder
+        self._text_names = set()
+
+        for field in TEMPLATE_FIELDS:
+            if field in self._config:
+                self._index(self._config[field], (field,))
+
+    def _index(self, value, path):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                self._index(item, path + (key,))
+        elif isinstance(value, list):
+            for position, item in enumerate(value):
+                self._index(item, path + (position,))
+        elif isinstance(value, str):
+            if value.startswith("eq."):
+                self._whole.setdefault(value[3:], []).append((path, True))
+            self._whole.setdefault(value, []).append((path, False))
+
+            parts = PLACEHOLDER_PATTERN.split(value)
+            names = PLACEHOLDER_PATTERN.findall(value)
+            # A lone placeholder is already a whole slot
+            if names and not (len(names) == 1 and value in (names[0], f"eq.{names[0]}")):
+                merged = []
+                for literal, name in zip(parts, names):
+                    merged.extend((literal, name))
+                merged.append(parts[-1])
+                self._text.append((path, merged))
+                self._text_names.update(names)
+
+    @property
+    def slot_count(self):
+        return sum(len(paths) for paths in self._whole.values()) + len(self._text)
+
+    def render(self, values, section_values=None):
+        """
+        Builds the request data.
+
+        values: {name: value} replacing whole values anywhere (an "eq." slot
+        becomes "eq.<value>") and {{name}} placeholders inside text.
+        section_values: {(section, name): value} placed as-is into whole
+        slots of that section only; takes precedence over `values`
+        (used for values injected from upstream responses).
+        """
+        replacements = {}   # path -> new value
+
+        if section_values:
+            for (section, name), value in section_values.items():
+                for path, _ in self._whole.get(name, ()):
+                    if path[0] == section and path not in replacements:
+                        replacements[path] = value
+
+        for name, value in values.items():
+            for path, is_eq in self._whole.get(name, ()):
+                if path not in replacements:
+                    replacements[path] = f"eq.{value}" if is_eq else value
+
+        if self._text and not self._text_names.isdisjoint(values):
+            for path, parts in self._text:
+                if path in replacements:
+                    continue
+                replacements[path] = "".join(
+                    str(values.get(part, part)) if position % 2 else part
+                    for position, part in enumerate(parts)
+                )
+
+        # Every container is copied, so callers may change the request data
+        # without touching the template
+        data = _fresh(self._config)
+        for path, value in replacements.items():
+            container = data
+            for key in path[:-1]:
+                container = container[key]
+            container[path[-1]] = value
+
+        return data
+
+
+def compile_templates(api_config):
+    """
+    Compiles every API of api_config_new.json: {api_name: RequestTemplate}.
+    """
+    return {api_name: RequestTemplate(entry) for api_name, entry in api_config.items()}
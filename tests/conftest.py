@@ -0,0 +1,44 @@
+import json
+import os
+import sys
+import threading
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeResponse:
+    """
+    Minimal requests.Response stand-in for the engines.
+    """
+
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body
+        self.content = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.text = self.content.decode("utf-8")
+        self.reason = "OK" if status_code < 400 else "Error"
+        self.timing = None
+
+    def __bool__(self):
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeTransport:
+    """
+    Answers every request with handler(api_data) -> FakeResponse and keeps
+    the requests it was sent.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, api_data):
+        with self._lock:
+            self.sent.append(api_data)
+        return self.handler(api_data)
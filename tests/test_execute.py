@@ -0,0 +1,130 @@
+import json
+import os
+import time
+
+import pytest
+
+from conftest import FakeResponse, FakeTransport
+from execute import execute_api_sequence
+from progress import RunCancelled, SummaryListener
+
+API_CONFIG = {
+    "Create": {"url": "http://stub", "method": "POST", "path": "/users", "headers": {"apikey": "{{apiKey}}"},
+               "params": {}, "body": {"name": "{{name}}"}},
+    "Get": {"url": "http://stub", "method": "GET", "path": "/users", "headers": {"apikey": "{{apiKey}}"},
+            "params": {"id": "eq.id"}, "body": {}},
+}
+INTERACTIONS = {
+    "Create": {"response": {}, "level": []},
+    "Get": {"response": {}, "level": [["Create"]], "Create": {"P": ["eq.id"]}},
+}
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """
+    Scenario "Test" with two iterations; the second Create fails.
+    """
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("configs")
+    os.makedirs("testcases")
+    with open("configs/api_config_new.json", "w") as f:
+        json.dump(API_CONFIG, f)
+    with open("testcases/testcases.json", "w") as f:
+        json.dump({"Test": {
+            "Create": [{"{{apiKey}}": "k", "{{name}}": "ok"}, {"{{apiKey}}": "k", "{{name}}": "bad"}],
+            "Get": [{"{{apiKey}}": "k"}, {"{{apiKey}}": "k"}],
+        }}, f)
+    return tmp_path
+
+
+def handler(api_data):
+    if api_data["method"] == "POST":
+        if api_data["body"]["name"] == "bad":
+            return FakeResponse(500, {"message": "boom"})
+        return FakeResponse(201, [{"id": 1}])
+    return FakeResponse(200, [{"id": 1}])
+
+
+@pytest.mark.parametrize("parallel_iterations", [1, 2])
+def test_skipped_calls_are_reported_apart_from_failures(workspace, parallel_iterations):
+    listener = SummaryListener()
+    transport = FakeTransport(handler)
+
+    execute_api_sequence(API_CONFIG, None, INTERACTIONS, "Test", listener, "projects/test.json", transport,
+                         parallel_iterations=parallel_iterations)
+
+    assert listener.status == {"Create": (1, 1, 0), "Get": (1, 0, 1)}
+    assert listener.failed == 1
+    assert listener.skipped == 1
+    # The skipped Get was never sent
+    assert [data["method"] for data in transport.sent].count("GET") == 1
+
+
+class CancellingListener(SummaryListener):
+    """
+    Asks to stop the run once `calls` calls were started.
+    """
+
+    def __init__(self, calls):
+        super().__init__()
+        self.calls = calls
+        self.checks = 0
+
+    def cancelled(self):
+        self.checks += 1
+        return self.checks > self.calls
+
+
+@pytest.mark.parametrize("parallel_iterations", [1, 4])
+def test_cancelled_run_stops_between_calls(workspace, parallel_iterations):
+    with open("testcases/testcases.json", "w") as f:
+        json.dump({"Test": {
+            "Create": [{"{{apiKey}}": "k", "{{name}}": "ok"}] * 50,
+            "Get": [{"{{apiKey}}": "k"}] * 50,
+        }}, f)
+    transport = FakeTransport(handler)
+
+    with pytest.raises(RunCancelled):
+        execute_api_sequence(API_CONFIG, None, INTERACTIONS, "Test", CancellingListener(3), "projects/test.json",
+                             transport, parallel_iterations=parallel_iterations)
+
+    assert len(transport.sent) <= 3
+    # The previous results are left in place
+    assert not os.path.exists("results/Test_results.jsonl")
+
+
+class UnstorableResponse(FakeResponse):
+    # Decodes to a body the results file cannot store
+    def json(self):
+        return {"ids": {1, 2}}
+
+
+def test_failing_run_drops_the_queued_iterations(workspace):
+    with open("testcases/testcases.json", "w") as f:
+        json.dump({"Test": {
+            "Create": [{"{{apiKey}}": "k", "{{name}}": "ok"}] * 200,
+            "Get": [{"{{apiKey}}": "k"}] * 200,
+        }}, f)
+
+    def handler(api_data):
+        # Slow enough that the workers cannot finish every iteration first
+        time.sleep(0.002)
+        return UnstorableResponse(200, [])
+
+    transport = FakeTransport(handler)
+    with pytest.raises(TypeError):
+        execute_api_sequence(API_CONFIG, None, INTERACTIONS, "Test", None, "projects/test.json", transport,
+                             parallel_iterations=2)
+
+    # Only the iterations already running when persisting failed sent requests
+    assert len(transport.sent) < 40
+
+
+def test_quiet_run_prints_no_iteration_lines(workspace, capsys):
+    execute_api_sequence(API_CONFIG, None, INTERACTIONS, "Test", None, "projects/test.json",
+                         FakeTransport(handler), verbose=False)
+
+    output = capsys.readouterr().out
+    assert "Total Test Iterations" not in output
+    assert "Executing" not in output
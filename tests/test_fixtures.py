@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import FakeResponse, FakeTransport
+from execute import execute_api_sequence
+from fixtures import Fixture, FixtureSet, load_fixtures
+from metrics import Metrics
+from progress import SummaryListener
+
+API_CONFIG = {
+    "Login": {"url": "http://stub", "method": "POST", "path": "/login", "headers": {},
+              "params": {}, "body": {"email": "{{email}}"}},
+    "ListA": {"url": "http://stub", "method": "GET", "path": "/a", "headers": {"Authorization": "{{token}}"},
+              "params": {}, "body": {}},
+    "ListB": {"url": "http://stub", "method": "GET", "path": "/b", "headers": {"Authorization": "{{token}}"},
+              "params": {}, "body": {}},
+}
+
+
+def ok(body):
+    return {"status_code": 200, "body": body, "error": None}
+
+
+def fixture_set(scope="run", **definition):
+    definition = {"scope": scope, "inputs": {"{{email}}": "qa@example.com"},
+                  "extract": {"{{token}}": "access_token"}, "refresh_on": [401], **definition}
+    return FixtureSet([Fixture("Login", definition, API_CONFIG)])
+
+
+class Server:
+    """
+    Login issuing t1, t2, ...; counts the logins.
+    """
+
+    def __init__(self, expires_in=None):
+        self.logins = 0
+        self.expires_in = expires_in
+        self.lock = threading.Lock()
+
+    def send(self, fixture_name, request_data):
+        with self.lock:
+            self.logins += 1
+            body = {"access_token": f"t{self.logins}"}
+        if self.expires_in is not None:
+            body["expires_in"] = self.expires_in
+        return ok(body)
+
+
+def test_run_scope_resolves_once_across_threads():
+    fixtures = fixture_set("run")
+    server = Server()
+    seen = []
+
+    def worker():
+        seen.append(fixtures.values(server.send))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.logins == 1
+    assert seen == [({"{{token}}": "t1"}, None)] * 8
+
+
+def test_worker_scope_resolves_once_per_thread():
+    fixtures = fixture_set("worker")
+    server = Server()
+
+    def worker():
+        fixtures.values(server.send)
+        fixtures.values(server.send)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.logins == 3
+
+
+def test_iteration_scope_resolves_every_time():
+    fixtures = fixture_set("iteration")
+    server = Server()
+
+    fixtures.values(server.send)
+    fixtures.values(server.send)
+
+    assert server.logins == 2
+
+
+def test_values_expire_and_are_refreshed():
+    # Lifetime read from the response; refreshed at half of it
+    fixtures = fixture_set(expires_in="expires_in")
+    server = Server(expires_in=0.1)
+
+    assert fixtures.values(server.send) == ({"{{token}}": "t1"}, None)
+    assert fixtures.values(server.send) == ({"{{token}}": "t1"}, None)
+    time.sleep(0.06)
+    assert fixtures.values(server.send) == ({"{{token}}": "t2"}, None)
+    assert server.logins == 2
+
+
+def test_failed_fixture_is_named():
+    fixtures = fixture_set()
+
+    assert fixtures.values(lambda name, data: {"status_code": 500, "body": None, "error": None}) == ({}, "Login")
+    assert fixtures.values(lambda name, data: ok({})) == ({}, "Login")
+
+
+def test_static_values_call_no_api():
+    fixtures = FixtureSet([Fixture("Keys", {"values": {"{{apiKey}}": "k"}}, API_CONFIG)])
+
+    assert fixtures.values(lambda name, data: pytest.fail("no call expected")) == ({"{{apiKey}}": "k"}, None)
+
+
+def test_invalidate_drops_only_the_rejected_values():
+    fixtures = fixture_set()
+    server = Server()
+    used, _ = fixtures.values(server.send)
+
+    # Not a refresh_on status
+    fixtures.invalidate(403, used)
+    assert fixtures.values(server.send)[0] == used
+
+    fixtures.invalidate(401, used)
+    refreshed, _ = fixtures.values(server.send)
+    assert refreshed == {"{{token}}": "t2"}
+
+    # A call that used the old values does not drop the refreshed ones
+    fixtures.invalidate(401, used)
+    assert fixtures.values(server.send)[0] == refreshed
+    assert server.logins == 2
+
+
+def test_load_fixtures(tmp_path):
+    assert load_fixtures("Test", API_CONFIG, str(tmp_path)) is None
+
+    with open(tmp_path / "Test_fixtures.json", "w") as f:
+        json.dump({"Login": {"scope": "worker", "refresh_on": [401]}}, f)
+    fixtures = load_fixtures("Test", API_CONFIG, str(tmp_path))
+
+    assert fixtures.refresh_statuses == {401}
+    with pytest.raises(ValueError):
+        FixtureSet([Fixture("Login", {"scope": "session"}, API_CONFIG)])
+
+
+class RetryCounter(Metrics):
+    def __init__(self):
+        self.retries = []
+
+    def retried(self, api_name):
+        self.retries.append(api_name)
+
+
+@pytest.mark.parametrize("parallel_iterations", [1, 3])
+def test_rejected_values_are_refreshed_for_concurrent_calls(tmp_path, monkeypatch, parallel_iterations):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("testcases")
+    with open("testcases/testcases.json", "w") as f:
+        json.dump({"Test": {"ListA": [{}] * 6, "ListB": [{}] * 6}}, f)
+    interactions = {"ListA": {"response": {}, "level": []}, "ListB": {"response": {}, "level": []}}
+
+    logins = []
+
+    def handler(api_data):
+        if api_data["path"] == "/login":
+            logins.append(1)
+            return FakeResponse(200, {"access_token": f"t{len(logins)}"})
+        # The first token is revoked
+        if api_data["headers"]["Authorization"] == "t1":
+            return FakeResponse(401, {"message": "expired"})
+        return FakeResponse(200, [])
+
+    listener = SummaryListener()
+    metrics = RetryCounter()
+    execute_api_sequence(API_CONFIG, None, interactions, "Test", listener, "projects/test.json",
+                         FakeTransport(handler), parallel_iterations=parallel_iterations, dag=True,
+                         metrics=metrics, fixtures=fixture_set())
+
+    # ListA and ListB both rejected t1: one login refreshed it for both
+    assert len(logins) == 2
+    assert listener.status == {"ListA": (6, 0, 0), "ListB": (6, 0, 0)}
+    assert 1 <= len(metrics.retries) <= 2 * parallel_iterations
@@ -0,0 +1,47 @@
+import pytest
+
+from conftest import FakeResponse, FakeTransport
+from execute import RunContext
+from load_runner import LoadProfile, run_load
+from plan import ExecutionPlan
+from progress import RunCancelled
+from test_execute import API_CONFIG, INTERACTIONS, CancellingListener
+
+TEST_CASES = {
+    "Create": [{"{{apiKey}}": "k", "{{name}}": "ok"}, {"{{apiKey}}": "k", "{{name}}": "bad"}],
+    "Get": [{"{{apiKey}}": "k"}, {"{{apiKey}}": "k"}],
+}
+
+
+def handler(api_data):
+    if api_data["method"] == "POST" and api_data["body"]["name"] == "bad":
+        raise RuntimeError("transport bug")
+    return FakeResponse(200, [{"id": 1}])
+
+
+def context(listener=None):
+    return RunContext(["Create", "Get"], ExecutionPlan(INTERACTIONS, API_CONFIG), TEST_CASES, listener=listener,
+                      transport=FakeTransport(handler), verbose=False)
+
+
+PROFILES = {
+    "closed": LoadProfile(2, [(0.3, 2)]),
+    "open": LoadProfile(2, [(0.3, 50)], arrival_rate=50),
+}
+
+
+@pytest.mark.parametrize("model", PROFILES)
+def test_errored_iterations_are_counted_and_the_run_goes_on(model):
+    summary = run_load(context(), PROFILES[model])
+
+    # Every other iteration raises; the virtual users keep going
+    assert summary["errored_iterations"] >= 1
+    assert summary["iterations"] >= 1
+    assert summary["errors"] == {"RuntimeError: transport bug": summary["errored_iterations"]}
+    assert summary["apis"]["Create"]["requests"] == summary["iterations"]
+
+
+@pytest.mark.parametrize("model", PROFILES)
+def test_cancelled_load_run_stops(model):
+    with pytest.raises(RunCancelled):
+        run_load(context(CancellingListener(3)), PROFILES[model])
@@ -0,0 +1,43 @@
+import pytest
+
+from plan import ExecutionPlan
+from utils import find_nested_value
+
+API_CONFIG = {
+    "Create": {"url": "http://stub", "method": "POST", "path": "/users", "headers": {}, "params": {}, "body": {}},
+    "Get": {"url": "http://stub", "method": "GET", "path": "/users", "headers": {}, "params": {"id": "eq.id"},
+            "body": {}},
+}
+INTERACTIONS = {
+    "Create": {"response": {}, "level": []},
+    "Get": {"response": {}, "level": [["Create"]], "Create": {"P": ["eq.id"]}},
+}
+
+
+@pytest.fixture
+def plan():
+    return ExecutionPlan(INTERACTIONS, API_CONFIG)
+
+
+def test_extract_follows_the_learned_path(plan):
+    assert plan.extract("Create", "id", {"data": [{"id": 1}]}) == 1
+    assert plan.extract("Create", "id", {"data": [{"id": 2, "name": "x"}]}) == 2
+
+
+@pytest.mark.parametrize("response", [
+    # A shallower key of that name
+    {"data": [{"id": 1}], "id": 7},
+    {"id": 7, "data": [{"id": 1}]},
+    # An earlier key or list item holding it
+    {"meta": {"id": 7}, "data": [{"id": 1}]},
+    {"data": [{"owner": {"id": 7}}, {"id": 1}]},
+    # Another shape altogether
+    [{"id": 7}],
+    {"data": {"id": 7}},
+    {"data": []},
+    {"data": [{"id": None}], "other": {"id": 7}},
+])
+def test_extract_matches_find_nested_value_when_the_shape_changes(plan, response):
+    assert plan.extract("Create", "id", {"data": [{"id": 1}]}) == 1
+
+    assert plan.extract("Create", "id", response) == find_nested_value(response, "id")
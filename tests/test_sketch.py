@@ -0,0 +1,55 @@
+from sketch import MAX_TIMELINE_BUCKETS, LatencyAggregator, QuantileSketch
+
+
+def result(end_s, status=200):
+    end_ns = end_s * 1_000_000_000
+    return {"status_code": status, "timing": {"start_ns": end_ns - 5_000_000, "end_ns": end_ns,
+                                              "total_ms": 5, "ttfb_ms": 4}}
+
+
+def test_quantiles_are_within_the_relative_accuracy():
+    sketch = QuantileSketch(accuracy=0.01)
+    for value in range(1, 10_001):
+        sketch.add(value)
+
+    for q, expected in ((0.5, 5_000), (0.9, 9_000), (0.99, 9_900)):
+        assert abs(sketch.quantile(q) - expected) <= expected * 0.01 + 1
+
+
+def test_timeline_counts_every_second_of_a_short_run():
+    aggregator = LatencyAggregator()
+    for second in (100, 100, 102):
+        aggregator.record("API", result(second))
+    aggregator.record("API", result(102, status=500))
+
+    assert aggregator.bucket_s == 1
+    assert aggregator.timeline() == [(0, 2, 0), (1, 0, 0), (2, 2, 1)]
+
+
+def test_timeline_buckets_widen_on_long_runs():
+    aggregator = LatencyAggregator()
+    seconds = 3 * MAX_TIMELINE_BUCKETS
+    for second in range(seconds):
+        aggregator.record("API", result(second))
+
+    assert aggregator.bucket_s == 4
+    assert len(aggregator.per_second) <= MAX_TIMELINE_BUCKETS
+    timeline = aggregator.timeline()
+    assert len(timeline) <= MAX_TIMELINE_BUCKETS
+    assert sum(responses for _, responses, _ in timeline) == seconds
+
+
+def test_merge_and_round_trip_keep_the_bucket_width():
+    long_run = LatencyAggregator()
+    for second in range(2 * MAX_TIMELINE_BUCKETS):
+        long_run.record("API", result(second))
+    short_run = LatencyAggregator()
+    short_run.record("API", result(1))
+
+    short_run.merge(long_run)
+    assert short_run.bucket_s == long_run.bucket_s == 2
+    assert sum(counts[0] for counts in short_run.per_second.values()) == 2 * MAX_TIMELINE_BUCKETS + 1
+
+    loaded = LatencyAggregator.from_dict(short_run.to_dict())
+    assert loaded.bucket_s == 2
+    assert loaded.timeline() == short_run.timeline()
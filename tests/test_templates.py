@@ -0,0 +1,50 @@
+from templates import RequestTemplate
+
+CONFIG = {
+    "url": "http://localhost",
+    "method": "POST",
+    "path": "/users/{{userId}}",
+    "headers": {"apikey": "{{apiKey}}", "Authorization": "Bearer {{token}}"},
+    "params": {"id": "eq.id"},
+    "body": {"name": "{{name}}", "meta": {"tags": ["a", "b"], "owner": {"team": "qa"}}},
+}
+
+
+def test_render_replaces_whole_text_and_eq_slots():
+    template = RequestTemplate(CONFIG)
+    data = template.render({"{{apiKey}}": "key", "{{token}}": "t1", "{{userId}}": 7, "{{name}}": "Arjun", "id": 3})
+
+    assert data["headers"] == {"apikey": "key", "Authorization": "Bearer t1"}
+    assert data["path"] == "/users/7"
+    assert data["params"] == {"id": "eq.3"}
+    assert data["body"]["name"] == "Arjun"
+
+
+def test_section_values_take_precedence_in_their_section():
+    template = RequestTemplate(CONFIG)
+    data = template.render({"id": 1}, {("params", "id"): "eq.9"})
+
+    assert data["params"] == {"id": "eq.9"}
+
+
+def test_changing_rendered_data_leaves_the_template_unchanged():
+    template = RequestTemplate(CONFIG)
+
+    first = template.render({})
+    first["body"]["meta"]["tags"].append("c")
+    first["body"]["meta"]["owner"]["team"] = "dev"
+    first["headers"]["apikey"] = "changed"
+
+    second = template.render({})
+    assert second["body"]["meta"] == {"tags": ["a", "b"], "owner": {"team": "qa"}}
+    assert second["headers"]["apikey"] == "{{apiKey}}"
+
+
+def test_renders_share_no_containers():
+    template = RequestTemplate(CONFIG)
+    first = template.render({"{{name}}": "a"})
+    second = template.render({"{{name}}": "b"})
+
+    assert first["body"]["meta"] is not second["body"]["meta"]
+    assert first["body"]["meta"]["tags"] is not second["body"]["meta"]["tags"]
+    assert first["body"]["name"] == "a" and second["body"]["name"] == "b"
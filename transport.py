@@ -0,0 +1,376 @@
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+
+
+def build_timing(start_ns, ttfb_ns, end_ns, connect_ns=None, tls_ns=None,
+                 request_bytes=0, response_bytes=0, connection_reused=None):
+    """
+    Builds the "timing" entry stored with every result. Timestamps are
+    time.perf_counter_ns() values (monotonic, only comparable within a run),
+    durations are milliseconds. connect_ms / tls_ms are None when the request
+    reused a connection or the client cannot measure them.
+    """
+
+    def to_ms(duration_ns):
+        return None if duration_ns is None else round(duration_ns / 1e6, 3)
+
+    return {
+        "start_ns": start_ns,
+        "end_ns": end_ns,
+        "total_ms": to_ms(end_ns - start_ns),
+        "ttfb_ms": to_ms(ttfb_ns - start_ns),
+        "connect_ms": to_ms(connect_ns),
+        "tls_ms": to_ms(tls_ns),
+        "request_bytes": request_bytes,
+        "response_bytes": response_bytes,
+        "connection_reused": connection_reused,
+    }
+
+
+def _headers_size(headers):
+    # "Name: value\r\n" per header plus the blank line ending the header block
+    return sum(len(str(k)) + len(str(v)) + 4 for k, v in headers.items()) + 2
+
+
+class _CountingPoolManager(PoolManager):
+    """
+    PoolManager that reports every opened socket, with its connect time,
+    to a callback. Requests that do not open a socket reused a pooled
+    keep-alive connection.
+    """
+
+    def __init__(self, on_new_connection, *args, **kwargs):
+        self._on_new_connection = on_new_connection
+        super().__init__(*args, **kwargs)
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context=request_context)
+        new_conn = pool._new_conn
+
+        def counted_new_conn():
+            conn = new_conn()
+            connect = conn.connect
+            open_socket = conn._new_conn
+            socket_times = []
+
+            # connect() opens the TCP socket through _new_conn() and then,
+            # for https, performs the TLS handshake on it
+            def timed_open_socket():
+                start = time.perf_counter_ns()
+                sock = open_socket()
+                socket_times.append(time.perf_counter_ns() - start)
+                return sock
+
+            # Pooled connections dropped by the server reconnect through the
+            # same object, so count the connects rather than the objects.
+            def counted_connect():
+                socket_times.clear()
+                start = time.perf_counter_ns()
+                result = connect()
+                connect_ns = time.perf_counter_ns() - start
+
+                tcp_ns = socket_times[0] if socket_times else connect_ns
+                tls_ns = connect_ns - tcp_ns if scheme == "https" else None
+                self._on_new_connection(host, tcp_ns, tls_ns)
+                return result
+
+            conn._new_conn = timed_open_socket
+            conn.connect = counted_connect
+            return conn
+
+        pool._new_conn = counted_new_conn
+        return pool
+
+
+class _CountingAdapter(HTTPAdapter):
+    def __init__(self, on_new_connection, **kwargs):
+        self._on_new_connection = on_new_connection
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _CountingPoolManager(
+            self._on_new_connection,
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            **pool_kwargs,
+        )
+
+
+class Transport:
+    """
+    HTTP transport for one run: keeps one keep-alive requests.Session per host
+    and counts how many requests reused a pooled connection.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, keep_alive=True,
+                 connect_timeout=10.0, read_timeout=30.0):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.timeout = (connect_timeout, read_timeout)
+
+        self._sessions = {}   # "scheme://netloc" -> Session
+        self._lock = threading.Lock()
+        self._requests = {}   # host -> requests sent
+        self._new_connections = {}  # host -> connections opened
+        # Connects happen on the sending thread, so send() finds the connect
+        # timings of its own request here
+        self._local = threading.local()
+
+    def _count_new_connection(self, host, tcp_ns, tls_ns):
+        self._local.connect = (tcp_ns, tls_ns)
+        with self._lock:
+            self._new_connections[host] = self._new_connections.get(host, 0) + 1
+
+    def session_for(self, url):
+        """
+        Returns the Session of the url's host, creating it on first use.
+        """
+        parsed = urlparse(url)
+        key = f"{parsed.scheme}://{parsed.netloc}"
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = _CountingAdapter(
+                    self._count_new_connection,
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                if not self.keep_alive:
+                    session.headers["Connection"] = "close"
+                self._sessions[key] = session
+        return session
+
+    def send(self, api_data):
+        """
+        Sends the request described by api_data (see request_handler.make_request).
+        The returned response carries the build_timing() dict as `.timing`.
+        Raises requests.exceptions.RequestException on transport errors.
+        """
+        method = api_data["method"]
+        url = api_data["url"] + api_data["path"]
+        headers = api_data.get("headers", {})
+        params = api_data.get("params", {})
+        body = api_data.get("body", {})
+
+        session = self.session_for(url)
+        host = urlparse(url).hostname
+
+        self._local.connect = None
+        start_ns = time.perf_counter_ns()
+
+        # stream=True returns once the headers arrived, which gives the TTFB
+        response = session.request(method, url, headers=headers, params=params, json=body,
+                                   timeout=self.timeout, stream=True)
+        ttfb_ns = time.perf_counter_ns()
+        content = response.content
+        end_ns = time.perf_counter_ns()
+
+        # Only answered requests count, failed connects reused nothing
+        with self._lock:
+            self._requests[host] = self._requests.get(host, 0) + 1
+
+        connect = self._local.connect
+        request = response.request
+        request_line = f"{request.method} {request.path_url} HTTP/1.1\r\n"
+        status_line = f"HTTP/1.1 {response.status_code} {response.reason}\r\n"
+
+        response.timing = build_timing(
+            start_ns, ttfb_ns, end_ns,
+            connect_ns=connect[0] if connect else None,
+            tls_ns=connect[1] if connect else None,
+            request_bytes=len(request_line) + _headers_size(request.headers) + len(request.body or b""),
+            response_bytes=len(status_line) + _headers_size(response.headers) + len(content),
+            connection_reused=connect is None,
+        )
+        return response
+
+    def stats(self):
+        """
+        Returns {host: {"requests", "new_connections", "reused_connections"}}
+        for the requests that got a response.
+        """
+        with self._lock:
+            stats = {}
+            for host, sent in self._requests.items():
+                opened = self._new_connections.get(host, 0)
+                stats[host] = {
+                    "requests": sent,
+                    "new_connections": opened,
+                    "reused_connections": max(sent - opened, 0),
+                }
+        return stats
+
+    def print_stats(self):
+        for host, host_stats in self.stats().items():
+            print(
+                f"🔌 {host}: {host_stats['requests']} requests, "
+                f"{host_stats['new_connections']} new connections, "
+                f"{host_stats['reused_connections']} reused"
+            )
+
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+class AsyncResponse:
+    """
+    Fully read aiohttp (or cassette replayed) response exposing the parts
+    of requests.Response the engine uses (truthiness, status_code, reason,
+    content, text, json()).
+    """
+
+    def __init__(self, status_code, reason, content, encoding, timing=None):
+        self.status_code = status_code
+        self.reason = reason
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self.timing = timing
+
+    def __bool__(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncTransport:
+    """
+    asyncio counterpart of Transport built on aiohttp: one ClientSession per
+    host, each keeping up to pool_maxsize connections, with the same
+    keep-alive, timeout and reuse-count settings. Sessions are not evicted,
+    so there is no pool_connections. Sessions are created lazily, so the
+    transport must be used and closed (aclose) on one event loop.
+    """
+
+    def __init__(self, pool_maxsize=100, keep_alive=True, connect_timeout=10.0, read_timeout=30.0):
+        # aiohttp is only needed by the async engine
+        import aiohttp
+
+        self._aiohttp = aiohttp
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.timeout = (connect_timeout, read_timeout)
+
+        self._sessions = {}   # "scheme://netloc" -> ClientSession
+        self._requests = {}   # host -> requests sent
+        self._new_connections = {}  # host -> connections opened
+
+    def _session_for(self, url):
+        parsed = urlparse(url)
+        key = f"{parsed.scheme}://{parsed.netloc}"
+
+        session = self._sessions.get(key)
+        if session is None:
+            aiohttp = self._aiohttp
+            host = parsed.hostname
+
+            # context.trace_request_ctx is the per-request dict passed by send()
+            async def on_connection_create_start(session, context, params):
+                context.trace_request_ctx["connect_start_ns"] = time.perf_counter_ns()
+
+            async def on_connection_create_end(session, context, params):
+                request_ctx = context.trace_request_ctx
+                request_ctx["connect_ns"] = time.perf_counter_ns() - request_ctx["connect_start_ns"]
+                self._new_connections[host] = self._new_connections.get(host, 0) + 1
+
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_start.append(on_connection_create_start)
+            trace_config.on_connection_create_end.append(on_connection_create_end)
+
+            connect_timeout, read_timeout = self.timeout
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_maxsize, force_close=not self.keep_alive),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+                trace_configs=[trace_config],
+            )
+            self._sessions[key] = session
+        return session
+
+    async def send(self, api_data):
+        """
+        Sends the request described by api_data and returns an AsyncResponse
+        carrying the build_timing() dict as `.timing`. aiohttp reports connect
+        time including the TLS handshake, so tls_ms stays None.
+        Raises aiohttp.ClientError / asyncio.TimeoutError on transport errors.
+        """
+        method = api_data["method"]
+        url = api_data["url"] + api_data["path"]
+        # aiohttp only accepts string header and query values
+        headers = {k: str(v) for k, v in api_data.get("headers", {}).items()}
+        params = {k: str(v) for k, v in api_data.get("params", {}).items()}
+        body = api_data.get("body", {})
+
+        session = self._session_for(url)
+        host = urlparse(url).hostname
+
+        request_ctx = {}
+        start_ns = time.perf_counter_ns()
+
+        async with session.request(method, url, headers=headers, params=params, json=body,
+                                   trace_request_ctx=request_ctx) as response:
+            ttfb_ns = time.perf_counter_ns()
+            content = await response.read()
+            end_ns = time.perf_counter_ns()
+
+            # Only answered requests count, failed connects reused nothing
+            self._requests[host] = self._requests.get(host, 0) + 1
+
+            request_info = response.request_info
+            request_line = f"{method} {request_info.url.raw_path_qs} HTTP/1.1\r\n"
+            status_line = f"HTTP/1.1 {response.status} {response.reason}\r\n"
+            response_headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in response.raw_headers}
+
+            connect_ns = request_ctx.get("connect_ns")
+            timing = build_timing(
+                start_ns, ttfb_ns, end_ns,
+                connect_ns=connect_ns,
+                request_bytes=len(request_line) + _headers_size(request_info.headers) + len(json.dumps(body).encode()),
+                response_bytes=len(status_line) + _headers_size(response_headers) + len(content),
+                connection_reused=connect_ns is None,
+            )
+            return AsyncResponse(response.status, response.reason, content, response.charset, timing)
+
+    def stats(self):
+        """
+        Returns {host: {"requests", "new_connections", "reused_connections"}}.
+        """
+        stats = {}
+        for host, sent in self._requests.items():
+            opened = self._new_connections.get(host, 0)
+            stats[host] = {
+                "requests": sent,
+                "new_connections": opened,
+                "reused_connections": max(sent - opened, 0),
+            }
+        return stats
+
+    print_stats = Transport.print_stats
+
+    async def aclose(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            await session.close()
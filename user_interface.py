@@ -7,17 +7,18 @@ from PyQt5.QtWidgets import (
     QTabWidget, QDialog, QLineEdit, QDialogButtonBox, QScrollArea, QGridLayout
 )
 from PyQt5.QtGui import QIcon, QPixmap, QMouseEvent, QDrag
-from PyQt5.QtCore import Qt, QPoint, QEvent, pyqtSignal, QMimeData
+from PyQt5.QtCore import Qt, QPoint, QEvent, pyqtSignal, QMimeData, QObject, QThread
 from PyQt5.QtGui import QCursor
 from PyQt5 import QtGui, QtCore
 import os
-import pandas as pd
-from utils import show_message
-from openpyxl import load_workbook
+from utils import parse_testcases_workbook, show_message
 from interactions import MainWindow
 from main_backend import startEngine
+from progress import ProgressListener
+from progress import RunCancelled
 from urllib.parse import urlparse
 import shutil
+import threading
 
 # Custom Dialog for Scenario Name Input
 class ScenarioNameDialog(QDialog):
@@ -362,6 +363,14 @@ class ApiBlock(QFrame):
                 padding: 3px 8px;
                 border-radius: 5px;
             }
+            ApiBlock QLabel#statusSkipped {
+                background-color: #E59A2F; /* Amber */
+                color: white;
+                font-size: 12px;
+                font-weight: bold;
+                padding: 3px 8px;
+                border-radius: 5px;
+            }
         """
         self.highlight_stylesheet = """
             ApiBlock {
@@ -454,10 +463,15 @@ class ApiBlock(QFrame):
         self.status_label_fail.setAlignment(Qt.AlignBottom | Qt.AlignRight)
         self.status_label_fail.hide()  # Initially hide the label
 
+        self.status_label_skip = QLabel()
+        self.status_label_skip.setAlignment(Qt.AlignBottom | Qt.AlignRight)
+        self.status_label_skip.hide()  # Initially hide the label
+
         bottom_h_layout = QHBoxLayout()
         bottom_h_layout.addStretch() # Pushes the label to the right
         bottom_h_layout.addWidget(self.status_label_pass)
         bottom_h_layout.addWidget(self.status_label_fail)
+        bottom_h_layout.addWidget(self.status_label_skip)
         
         v_layout.addLayout(bottom_h_layout)
         # --- END NEW ---
@@ -490,13 +504,12 @@ class ApiBlock(QFrame):
         self.status_label_pass.setText(text)
         self.status_label_pass.show()
 
-        # Hide failed label only during progress
+        # Hide failed and skipped labels only during progress
         self.status_label_fail.setVisible(False)
-
-        QApplication.processEvents()
+        self.status_label_skip.setVisible(False)
 
 
-    def set_status(self, success, fail):
+    def set_status(self, success, fail, skipped=0):
 
         self.status_label_pass.setText("Passed: "+str(success))
         self.status_label_pass.setObjectName("statusPassed")
@@ -513,7 +526,14 @@ class ApiBlock(QFrame):
             self.status_label_fail.style().polish(self.status_label_fail)
             self.status_label_fail.repaint()
 
-        QApplication.processEvents()
+        # Calls not sent because an upstream API failed
+        if skipped!=0:
+            self.status_label_skip.setText("Skipped: "+str(skipped))
+            self.status_label_skip.setObjectName("statusSkipped")
+
+            self.status_label_skip.show()
+            self.status_label_skip.style().polish(self.status_label_skip)
+            self.status_label_skip.repaint()
 
     def reset_status(self):
         """
@@ -531,6 +551,66 @@ class ApiBlock(QFrame):
         self.status_label_fail.style().polish(self.status_label_fail)  # Refresh style
         self.status_label_fail.repaint()
 
+        self.status_label_skip.setText("")  # Clear text
+        self.status_label_skip.setObjectName("")  # Remove style classes
+        self.status_label_skip.hide()  # Hide until used
+        self.status_label_skip.style().polish(self.status_label_skip)  # Refresh style
+        self.status_label_skip.repaint()
+
+
+
+class _SignalListener(ProgressListener):
+    """
+    Turns engine progress into RunWorker signals. Runs on the worker thread;
+    the signals are queued to the GUI thread.
+    """
+
+    def __init__(self, worker):
+        self.worker = worker
+
+    def on_run_start(self, sequence, total_iterations):
+        self.worker.run_started.emit()
+
+    def on_progress(self, api_index, api_name, test_index, total_iterations):
+        self.worker.progress.emit(api_index, f"Executing {test_index + 1}/{total_iterations} ...")
+
+    def on_status(self, api_index, api_name, passed, failed, skipped=0):
+        self.worker.status.emit(api_index, passed, failed, skipped)
+
+    def cancelled(self):
+        return self.worker.cancel_requested.is_set()
+
+
+class RunWorker(QObject):
+    """
+    Runs a scenario on a background QThread so the GUI stays responsive.
+    The engine never touches widgets; ApiBlocks are updated from signals.
+    """
+    run_started = pyqtSignal()
+    progress = pyqtSignal(int, str)     # api_index, text
+    status = pyqtSignal(int, int, int, int)  # api_index, passed, failed, skipped
+    failed = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, scenario_name, project_path):
+        super().__init__()
+        self.scenario_name = scenario_name
+        self.project_path = project_path
+        # Set from the GUI thread; the engine stops before its next call
+        self.cancel_requested = threading.Event()
+
+    def cancel(self):
+        self.cancel_requested.set()
+
+    def run(self):
+        try:
+            startEngine.runBackend(self.scenario_name, _SignalListener(self), self.project_path)
+        except RunCancelled:
+            pass
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            self.finished.emit()
 
 
 # Main application window class
@@ -555,6 +635,12 @@ class FlowTestStudio(QMainWindow):
 
         self.current_project_file = None
 
+        # Background run of the active scenario (see on_run_backend)
+        self.run_thread = None
+        self.run_worker = None
+        self.run_api_blocks = []
+        self.closing = False   # exit confirmed, waiting for the run to stop
+
         # Keep track of occupied cells in the grid for each tab
         self.tab_grid_occupancy = {}
         self.on_change = False
@@ -834,36 +920,11 @@ class FlowTestStudio(QMainWindow):
             
         try:
             # Parse the Excel file
-            testcases = {}
-            wb = load_workbook(file_path)
-            sheet_names = wb.sheetnames
-            
-            for sheet_name in sheet_names:
-                df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
-                scenario_data = {}
-                
-                for col in df.columns:
-                    api_name = str(df[col].iloc[0]).strip()
-                    if not api_name:
-                        continue
-                        
-                    test_cases = []
-                    for row in range(1, len(df)):
-                        test_case_str = str(df[col].iloc[row]).strip()
-                        if test_case_str and test_case_str != 'nan':
-                            try:
-                                test_case = json.loads(test_case_str.replace("'", '"'))
-                                test_cases.append(test_case)
-                            except json.JSONDecodeError:
-                                show_message("Invalid JSON", f"Invalid JSON in sheet {sheet_name}, API {api_name}, row {row+1}",level="warning")
-                                continue
-                                
-                    if test_cases:
-                        scenario_data[api_name] = test_cases
-                
-                if scenario_data:
-                    testcases[sheet_name] = scenario_data
-                    
+            def on_invalid(sheet_name, api_name, row):
+                show_message("Invalid JSON", f"Invalid JSON in sheet {sheet_name}, API {api_name}, row {row}",level="warning")
+
+            testcases = parse_testcases_workbook(file_path, on_invalid)
+
             # Save to JSON file
             os.makedirs("testcases", exist_ok=True)
             output_path = os.path.join("testcases", "testcases.json")
@@ -1804,20 +1865,75 @@ class FlowTestStudio(QMainWindow):
         self.interaction_window.show()
 
     def on_run_backend(self):
+        if self.run_thread is not None:
+            show_message("Run in progress", "A scenario is already running, please wait until it finishes.", level="warning")
+            return
+
         # Call your backend when button is clicked
         self.save_project()
-        startEngine.runBackend(self.scenario_name, self.get_api_blocks(), self.current_project_file)
+        self.run_api_blocks = self.get_api_blocks()
+
+        # The engine runs on a worker thread; its signals are queued back to
+        # this (GUI) thread, so no processEvents() calls are needed.
+        self.run_thread = QThread(self)
+        self.run_worker = RunWorker(self.scenario_name, self.current_project_file)
+        self.run_worker.moveToThread(self.run_thread)
+
+        self.run_worker.run_started.connect(self._on_run_started, Qt.QueuedConnection)
+        self.run_worker.progress.connect(self._on_run_progress, Qt.QueuedConnection)
+        self.run_worker.status.connect(self._on_run_status, Qt.QueuedConnection)
+        self.run_worker.failed.connect(self._on_run_failed, Qt.QueuedConnection)
+        self.run_worker.finished.connect(self.run_thread.quit)
+        self.run_thread.started.connect(self.run_worker.run)
+        self.run_thread.finished.connect(self._on_run_thread_finished)
+
+        self.run_thread.start()
+
+    def _on_run_started(self):
+        for block in self.run_api_blocks:
+            block.reset_status()
+
+    def _on_run_progress(self, api_index, text):
+        if api_index < len(self.run_api_blocks):
+            self.run_api_blocks[api_index].set_progress(text)
+
+    def _on_run_status(self, api_index, passed, failed, skipped):
+        if api_index < len(self.run_api_blocks):
+            self.run_api_blocks[api_index].set_status(passed, failed, skipped)
+
+    def _on_run_failed(self, message):
+        show_message("Run failed", f"Scenario run failed: {message}", level="critical")
+
+    def _on_run_thread_finished(self):
+        self.run_worker.deleteLater()
+        self.run_thread.deleteLater()
+        self.run_worker = None
+        self.run_thread = None
     
     def closeEvent(self, event):
-        if self.current_tab_work_area_content_widget != None and self.on_change == True:
-            reply = show_message("Confirmation", 'Are you sure you want to exit?', level="question")
-
-            if reply == QMessageBox.Yes:  # Yes clicked
-                event.accept()
-            else:      # No clicked
-                event.ignore()
-        else:
-            event.accept()
+        if not self.closing:
+            if self.current_tab_work_area_content_widget != None and self.on_change == True:
+                reply = show_message("Confirmation", 'Are you sure you want to exit?', level="question")
+                if reply != QMessageBox.Yes:
+                    event.ignore()
+                    return
+
+            if self.run_thread is not None:
+                reply = show_message("Confirmation", 'A scenario is still running. Stop it and exit?', level="question")
+                if reply != QMessageBox.Yes:
+                    event.ignore()
+                    return
+
+                # The engine stops before its next call; the window closes
+                # once the run thread finished, without blocking the GUI
+                self.closing = True
+                self.run_worker.cancel()
+                self.run_thread.finished.connect(self.close)
+
+        if self.run_thread is not None:
+            event.ignore()
+            return
+        event.accept()
 
 
 if __name__ == '__main__':
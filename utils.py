@@ -1,7 +1,4 @@
-import pandas as pd
 import json
-from PyQt5.QtWidgets import QMessageBox
-from PyQt5.QtCore import Qt
 import os
 
 def find_nested_value(data, key):
@@ -20,6 +17,64 @@ def find_nested_value(data, key):
                 return result
     return None
 
+def find_nested_path(data, key):
+    """
+    Returns the path (tuple of dict keys / list indices) to the value
+    find_nested_value(data, key) would return, or None if there is none.
+    """
+    if isinstance(data, dict):
+        if key in data:
+            # Like find_nested_value, a None match ends this dict's search
+            return (key,) if data[key] is not None else None
+        for sub_key in data:
+            result = find_nested_path(data[sub_key], key)
+            if result is not None:
+                return (sub_key,) + result
+    elif isinstance(data, list):
+        for index, item in enumerate(data):
+            result = find_nested_path(item, key)
+            if result is not None:
+                return (index,) + result
+    return None
+
+def get_path_value(data, path):
+    """
+    Follows a find_nested_path() path. Raises LookupError/TypeError when
+    the data does not have that shape.
+    """
+    for step in path:
+        data = data[step]
+    return data
+
+def get_first_match(data, path, key):
+    """
+    Follows a find_nested_path(data, key) path learned on an earlier
+    response. Returns the value when the path still leads to the match
+    find_nested_value(data, key) returns, None when it does not: the shape
+    changed, or a shallower or earlier key of that name comes first.
+    """
+    for step in path:
+        if isinstance(data, dict):
+            if key in data and step != key:
+                return None
+            if step not in data:
+                return None
+            for sub_key in data:
+                if sub_key == step:
+                    break
+                if find_nested_value(data[sub_key], key) is not None:
+                    return None
+        elif isinstance(data, list):
+            if not isinstance(step, int) or not 0 <= step < len(data):
+                return None
+            for item in data[:step]:
+                if find_nested_value(item, key) is not None:
+                    return None
+        else:
+            return None
+        data = data[step]
+    return data
+
 def load_test_case_data(json_file_path):
     """
     Reads the test case JSON file and loads it into a dictionary.
@@ -29,6 +84,50 @@ def load_test_case_data(json_file_path):
     
     return test_case_data
 
+def parse_testcases_workbook(file_path, on_invalid=None):
+    """
+    Parses a testcases workbook: one sheet per scenario, one column per API
+    with the API name in the first row and one JSON testcase per cell below.
+    Returns {scenario: {api: [testcase, ...]}}. Invalid cells are skipped
+    and reported to on_invalid(sheet_name, api_name, row).
+    """
+    # Imported here so the engine modules that use utils stay usable without pandas
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    testcases = {}
+    wb = load_workbook(file_path)
+    sheet_names = wb.sheetnames
+
+    for sheet_name in sheet_names:
+        df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
+        scenario_data = {}
+
+        for col in df.columns:
+            api_name = str(df[col].iloc[0]).strip()
+            if not api_name:
+                continue
+
+            test_cases = []
+            for row in range(1, len(df)):
+                test_case_str = str(df[col].iloc[row]).strip()
+                if test_case_str and test_case_str != 'nan':
+                    try:
+                        test_case = json.loads(test_case_str.replace("'", '"'))
+                        test_cases.append(test_case)
+                    except json.JSONDecodeError:
+                        if on_invalid:
+                            on_invalid(sheet_name, api_name, row + 1)
+                        continue
+
+            if test_cases:
+                scenario_data[api_name] = test_cases
+
+        if scenario_data:
+            testcases[sheet_name] = scenario_data
+
+    return testcases
+
 # Initialize an API with a response placeholder
 def initialize_api(api_name, api_interactions):
     if api_name not in api_interactions:
@@ -91,6 +190,10 @@ def show_message(title, message, level="info"):
         For question → True (Yes), False (No)
         For others  → None
     """
+    # Imported here so the engine modules that use utils stay usable without Qt
+    from PyQt5.QtWidgets import QMessageBox
+    from PyQt5.QtCore import Qt
+
     msg = QMessageBox()
     msg.setWindowTitle(title)
     msg.setTextFormat(Qt.PlainText)